@@ -0,0 +1,8 @@
+#!/usr/bin/env bash
+# Derleme adımı (Render "Build Command": ./build.sh). staticfiles/ repoda tutulmaz;
+# CDN kopyaları indirilir, ardından hash'li/sıkıştırılmış static dosyalar üretilir.
+set -o errexit
+
+pip install -r requirements.txt
+python manage.py vendor_static
+python manage.py collectstatic --no-input
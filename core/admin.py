@@ -1,11 +1,28 @@
-from django.contrib import admin
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.urls import path, reverse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST
 from django.utils.html import format_html
+from .forms import AdminUserChangeForm, CSVImportForm
+from .returns import reprice_pending_investments, with_returns
+from .pagination import EstimatedCountPaginator
+from .search import search
 from .models import (
+    ConcurrentUpdateError,
     Package,
     Investment,
+    InvestmentEvent,
     PaymentConfirmation,
     CryptoWallet,
     SiteSetting,
@@ -13,12 +30,29 @@ from .models import (
     Profile
 )
 
+class ProfileSearchAdminMixin:
+    """
+    Arama, JOIN'li icontains yerine profilin indeksli search_document sütununda yapılır
+    (core.search); `package_lookup` verilen modellerde paket adıyla, sayısal terimler
+    kaydın ID'siyle de eşleşir. Büyük tablolarda
+    toplam kayıt sayısı için tam COUNT(*) çalıştırılmaz.
+    """
+    profile_lookup = 'profile'
+    package_lookup = None
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def get_search_results(self, request, queryset, search_term):
+        return search(queryset, search_term, self.profile_lookup, self.package_lookup), False
+
+
 # User admin kaydını kaldır
 admin.site.unregister(User)
 
 # User admin yeniden kaydediliyor
 @admin.register(User)
 class CustomUserAdmin(BaseUserAdmin):
+    form = AdminUserChangeForm
     list_display = ('username', 'email', 'first_name', 'last_name', 'is_active', 'last_login')
     list_filter = ('is_active', 'is_staff', 'is_superuser')
     search_fields = ('username', 'email', 'first_name', 'last_name')
@@ -26,10 +60,17 @@ class CustomUserAdmin(BaseUserAdmin):
 
 
 @admin.register(Profile)
-class ProfileAdmin(admin.ModelAdmin):
+class ProfileAdmin(ProfileSearchAdminMixin, admin.ModelAdmin):
+    profile_lookup = ''
     list_display = ('user', 'role', 'phone_number', 'address')
     list_filter = ('role',)
-    search_fields = ('user__username', 'user__email', 'phone_number')
+    search_fields = ('search_document',)
+    ordering = ('user__username',)
+    list_select_related = ('user',)
+
+    def get_queryset(self, request):
+        # __str__ kullanıcı adını okur; autocomplete sonuçları da bu queryset'ten gelir
+        return super().get_queryset(request).select_related('user')
 
 
 @admin.register(SiteSetting)
@@ -52,108 +93,325 @@ class CryptoWalletAdmin(admin.ModelAdmin):
 class PackageAdmin(admin.ModelAdmin):
     list_display = ('name', 'price', 'duration_days', 'profit_percent')
     search_fields = ('name',)
+    ordering = ('name',)
     list_editable = ('price', 'duration_days', 'profit_percent')
+    actions = ['reprice_pending']
+
+    @admin.action(description="Bekleyen yatırımları güncel getiri oranıyla yeniden fiyatla")
+    def reprice_pending(self, request, queryset):
+        # list_editable ile oran değiştirildiğinde mevcut yatırımlar kendiliğinden güncellenmez
+        for package in queryset:
+            updated = reprice_pending_investments(package)
+            self.message_user(request, f"{package.name}: %{package.profit_percent} ile {updated} yatırım güncellendi.")
+
+
+class ConcurrentUpdateAdminMixin:
+    """
+    save_changes() içindeki ConcurrentUpdateError yakalanır: hiçbir değişiklik
+    kaydedilmez, kullanıcı bir hata mesajıyla güncel verili forma geri döner.
+    """
+
+    def save_model(self, request, obj, form, change):
+        try:
+            with transaction.atomic():
+                self.save_changes(request, obj, form, change)
+        except ConcurrentUpdateError as exc:
+            obj._concurrent_update = True
+            self.message_user(
+                request, f"{exc} Form güncel verilerle yeniden açıldı, değişikliklerinizi tekrar uygulayın.",
+                messages.ERROR,
+            )
+
+    def log_change(self, request, obj, message):
+        if not getattr(obj, '_concurrent_update', False):
+            return super().log_change(request, obj, message)
+
+    def response_change(self, request, obj):
+        if getattr(obj, '_concurrent_update', False):
+            return HttpResponseRedirect(request.path)
+        return super().response_change(request, obj)
+
+
+class InvestmentAdminForm(forms.ModelForm):
+    class Meta:
+        model = Investment
+        fields = '__all__'
+        # Formun açıldığı andaki sürüm; kayıt sırasında karşılaştırılır
+        widgets = {'version': forms.HiddenInput}
 
 
 @admin.register(Investment)
-class InvestmentAdmin(admin.ModelAdmin):
+class InvestmentAdmin(ProfileSearchAdminMixin, ConcurrentUpdateAdminMixin, admin.ModelAdmin):
+    package_lookup = 'package'
+    form = InvestmentAdminForm
     list_display = (
         'get_username', 'package', 'amount', 'expected_return', 'status',
-        'created_at', 'approved_at', 'cancelled_at', 'refunded_at'
+        'created_at', 'approved_at', 'matures_at', 'cancelled_at', 'refunded_at'
     )
     list_filter = ('status', 'package')
-    search_fields = ('profile__user__username', 'profile__user__email', 'package__name')
+    search_fields = ('profile__search_document',)
+    autocomplete_fields = ('profile', 'package')
+    list_select_related = ('profile__user', 'package')
     readonly_fields = ('expected_return', 'created_at', 'approved_at', 'cancelled_at', 'refunded_at')
+    date_hierarchy = 'created_at'
+    actions = ['mark_approved', 'mark_cancelled', 'mark_refunded', 'export_csv', 'export_xlsx']
+
+    def _transition(self, request, queryset, status):
+        changed, conflicts = queryset.transition(status, actor=request.user)
+        self.message_user(request, f"{changed} yatırım '{dict(Investment.STATUS_CHOICES)[status]}' durumuna alındı.")
+        if conflicts:
+            self.message_user(
+                request, f"{conflicts} yatırım bu sırada başka bir işlemle değiştirildiği için atlandı.", messages.WARNING,
+            )
+
+    @admin.action(description="Seçilenleri onayla")
+    def mark_approved(self, request, queryset):
+        self._transition(request, queryset, Investment.STATUS_APPROVED)
+
+    @admin.action(description="Seçilenleri iptal et")
+    def mark_cancelled(self, request, queryset):
+        self._transition(request, queryset, Investment.STATUS_CANCELLED)
+
+    @admin.action(description="Seçilenleri iade edildi olarak işaretle")
+    def mark_refunded(self, request, queryset):
+        self._transition(request, queryset, Investment.STATUS_REFUNDED)
+
+    @admin.action(description="Seçilenleri CSV olarak dışa aktar")
+    def export_csv(self, request, queryset):
+        # Dışa/içe aktarma modülleri yalnızca kullanıldığında yüklenir; açılışı uzatmasın
+        from .exports import export_response
+
+        return export_response('investments', queryset, 'csv')
+
+    @admin.action(description="Seçilenleri XLSX olarak dışa aktar")
+    def export_xlsx(self, request, queryset):
+        from .exports import export_response
+
+        return export_response('investments', queryset, 'xlsx')
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='core_investment_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        from .imports import IMPORTS, import_csv
+
+        form = CSVImportForm(request.POST or None, request.FILES or None)
+        report = skipped = None
+        if form.is_valid():
+            model = IMPORTS[form.cleaned_data['kind']][0]
+            if not request.user.has_perm(f'{model._meta.app_label}.add_{model._meta.model_name}'):
+                raise PermissionDenied
+            upload = form.cleaned_data['csv_file']
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            report = import_csv(form.cleaned_data['kind'], stream)
+            skipped = len(report.errors)
+            del report.errors[200:]  # sayfada yalnızca ilk hatalar listelenir
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'CSV içe aktar',
+            'form': form,
+            'report': report,
+            'skipped': skipped,
+        }
+        return TemplateResponse(request, 'admin/core/import_csv.html', context)
+
+    def get_queryset(self, request):
+        # __str__ kullanıcı ve paket adını okur (PaymentConfirmation autocomplete'i dahil)
+        return with_returns(super().get_queryset(request)).select_related('profile__user', 'package')
+
+    @admin.display(description='Vade Tarihi', ordering='matures_at')
+    def matures_at(self, obj):
+        return obj.matures_at
 
     def get_username(self, obj):
         return getattr(obj.profile.user, 'username', '-') or '-'
     get_username.short_description = 'Kullanıcı'
 
-    def save_model(self, request, obj, form, change):
-        if 'status' in form.changed_data:
-            now = timezone.now()
-            if obj.status == Investment.STATUS_APPROVED:
-                obj.approved_at = now
-                obj.cancelled_at = None
-                obj.refunded_at = None
-            elif obj.status == Investment.STATUS_CANCELLED:
-                obj.cancelled_at = now
-                obj.approved_at = None
-                obj.refunded_at = None
-            elif obj.status == Investment.STATUS_REFUNDED:
-                obj.refunded_at = now
-                obj.approved_at = None
-                obj.cancelled_at = None
-            else:
-                obj.approved_at = None
-                obj.cancelled_at = None
-                obj.refunded_at = None
-
-        super().save_model(request, obj, form, change)
-
-        if hasattr(obj.profile, 'user') and hasattr(obj.profile, 'investment_summary'):
-            update_user_investment_summary(obj.profile)
+    def save_changes(self, request, obj, form, change):
+        if not change:
+            obj.save(actor=request.user)
+            UserInvestmentSummary.objects.rebuild([obj.profile_id])
+            return
+        # Durum dışındaki alanlar formun okuduğu sürüme koşullu kaydedilir,
+        # durum değişikliği ise status + version üzerinden transition() ile yapılır
+        new_status, obj.status = obj.status, form.initial['status']
+        other_fields = [name for name in form.changed_data if name not in ('status', 'version')]
+        if other_fields:
+            obj.save(update_fields=other_fields)
+        if new_status != obj.status:
+            obj.transition(new_status, actor=request.user)  # özeti kendisi yeniden kurar
+        else:
+            UserInvestmentSummary.objects.rebuild([obj.profile_id])
 
 
 @admin.register(PaymentConfirmation)
-class PaymentConfirmationAdmin(admin.ModelAdmin):
+class PaymentConfirmationAdmin(ProfileSearchAdminMixin, ConcurrentUpdateAdminMixin, admin.ModelAdmin):
+    profile_lookup = 'investment__profile'
+    package_lookup = 'investment__package'
     list_display = (
         'investment', 'whatsapp_number', 'admin_approved',
-        'admin_approved_at', 'sent_at', 'payment_screenshot_preview'
+        'admin_approved_at', 'sent_at', 'duplicate_flag', 'payment_screenshot_preview'
+    )
+    list_filter = (
+        'admin_approved', ('possible_duplicate', admin.EmptyFieldListFilter),
+        'investment__status', 'investment__package',
     )
-    list_filter = ('admin_approved',)
-    search_fields = ('whatsapp_number', 'investment__profile__user__username', 'investment__profile__user__email')
-    readonly_fields = ('sent_at', 'admin_approved_at', 'payment_screenshot_preview')
+    search_fields = ('investment__profile__search_document',)
+    autocomplete_fields = ('investment',)
+    list_select_related = ('investment__profile__user', 'investment__package')
+    date_hierarchy = 'sent_at'
+    actions = ['export_csv', 'export_xlsx']
+    readonly_fields = ('sent_at', 'admin_approved_at', 'duplicate_flag', 'payment_screenshot_preview')
     fields = (
         'investment',
         'whatsapp_number',
         'payment_screenshot',
         'payment_screenshot_preview',
+        'duplicate_flag',
         'admin_approved',
         'sent_at',
         'admin_approved_at',
     )
 
-    def save_model(self, request, obj, form, change):
-        if 'admin_approved' in form.changed_data:
+    def save_changes(self, request, obj, form, change):
+        if not change:
             obj.admin_approved_at = timezone.now() if obj.admin_approved else None
-        super().save_model(request, obj, form, change)
+            obj.save()
+        else:
+            other_fields = [name for name in form.changed_data if name != 'admin_approved']
+            if other_fields:
+                obj.save(update_fields=other_fields)
+            if 'admin_approved' in form.changed_data:
+                obj.set_approved(obj.admin_approved)
+        UserInvestmentSummary.objects.rebuild([obj.investment.profile_id])
+
+    def get_urls(self):
+        return [
+            path('review/', self.admin_site.admin_view(self.review_view), name='core_paymentconfirmation_review'),
+            path(
+                'review/<int:pk>/<str:decision>/', self.admin_site.admin_view(self.review_decision_view),
+                name='core_paymentconfirmation_review_decision',
+            ),
+        ] + super().get_urls()
+
+    def review_view(self, request):
+        # Her inceleyici kuyruğun farklı dekontlarını sahiplenir; aynı dekont iki kişiye düşmez
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        try:
+            limit = min(max(int(request.GET.get('n', '')), 1), 50)
+        except ValueError:
+            limit = PaymentConfirmation.REVIEW_BATCH_SIZE
+        claimed = list(
+            PaymentConfirmation.objects.claim(request.user, limit, PaymentConfirmation.REVIEW_LEASE)
+            .select_related('investment__profile__user', 'investment__package')
+            .order_by('sent_at', 'pk')
+        )
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Dekont inceleme kuyruğu',
+            'claimed': claimed,
+            'claim_expires_at': claimed[0].claim_expires_at if claimed else None,
+            'waiting': PaymentConfirmation.objects.review_queue().count(),
+        }
+        return TemplateResponse(request, 'admin/core/paymentconfirmation/review.html', context)
+
+    @method_decorator(require_POST)
+    def review_decision_view(self, request, pk, decision):
+        if decision not in ('approve', 'reject', 'release'):
+            raise Http404
+        confirmation = get_object_or_404(PaymentConfirmation.objects.select_related('investment'), pk=pk)
+        if not self.has_change_permission(request, confirmation):
+            raise PermissionDenied
+        if decision == 'release':
+            PaymentConfirmation.objects.filter(pk=pk).release(request.user)
+            return JsonResponse({'ok': True})
+        if confirmation.is_claimed_by_other(request.user):
+            return JsonResponse({'error': "Bu dekont başka bir yönetici tarafından inceleniyor."}, status=409)
+        investment = confirmation.investment
+        if confirmation.admin_approved or investment.status != Investment.STATUS_PENDING:
+            return JsonResponse({'error': "Bu dekont için zaten karar verilmiş."}, status=409)
+
+        try:
+            with transaction.atomic():
+                if decision == 'approve':
+                    confirmation.set_approved(True)
+                    investment.transition(Investment.STATUS_APPROVED, actor=request.user)
+                    message = "İnceleme kuyruğundan onaylandı."
+                else:
+                    investment.transition(Investment.STATUS_CANCELLED, actor=request.user)
+                    PaymentConfirmation.objects.filter(pk=pk).update(claimed_by=None, claim_expires_at=None)
+                    message = "İnceleme kuyruğundan reddedildi; yatırım iptal edildi."
+        except ConcurrentUpdateError as exc:
+            return JsonResponse({'error': str(exc)}, status=409)
+        self.log_change(request, confirmation, message)
+        return JsonResponse({'ok': True})
+
+    @admin.action(description="Seçilenleri CSV olarak dışa aktar")
+    def export_csv(self, request, queryset):
+        from .exports import export_response
+
+        return export_response('confirmations', queryset, 'csv')
 
-        if hasattr(obj.investment.profile, 'investment_summary'):
-            update_user_investment_summary(obj.investment.profile)
+    @admin.action(description="Seçilenleri XLSX olarak dışa aktar")
+    def export_xlsx(self, request, queryset):
+        from .exports import export_response
+
+        return export_response('confirmations', queryset, 'xlsx')
+
+    @admin.display(description="Olası mükerrer", ordering='possible_duplicate')
+    def duplicate_flag(self, obj):
+        if not obj.possible_duplicate_id:
+            return "-"
+        return format_html(
+            '<a href="{}" style="color: var(--error-fg)">⚠ #{}</a>',
+            reverse('admin:core_paymentconfirmation_change', args=[obj.possible_duplicate_id]),
+            obj.possible_duplicate_id,
+        )
 
     def payment_screenshot_preview(self, obj):
         if obj.payment_screenshot:
-            return format_html('<img src="{}" width="150" />', obj.payment_screenshot.url)
+            return format_html('<img src="{}" width="150" />', reverse('payment_screenshot', args=[obj.pk]))
         return "-"
     payment_screenshot_preview.short_description = "Ödeme Görseli"
 
 
+@admin.register(InvestmentEvent)
+class InvestmentEventAdmin(admin.ModelAdmin):
+    list_display = ('investment_id', 'from_status', 'to_status', 'actor', 'created_at')
+    list_filter = ('to_status',)
+    search_fields = ('=investment__id', 'investment__profile__user__username')
+    date_hierarchy = 'created_at'
+    list_select_related = ('actor',)
+
+    # Olay tablosu yalnızca eklemeye açık; admin'den değiştirilemez
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(UserInvestmentSummary)
-class UserInvestmentSummaryAdmin(admin.ModelAdmin):
+class UserInvestmentSummaryAdmin(ProfileSearchAdminMixin, admin.ModelAdmin):
     list_display = (
         'get_username', 'total_invested', 'total_return',
         'pending_payments', 'has_active_investment'
     )
-    search_fields = (
-        'profile__user__username', 'profile__user__first_name',
-        'profile__user__last_name', 'profile__user__email'
-    )
+    search_fields = ('profile__search_document',)
+    autocomplete_fields = ('profile',)
+    list_select_related = ('profile__user',)
     readonly_fields = ('total_invested', 'total_return', 'pending_payments')
     fields = ('profile', 'total_invested', 'total_return', 'pending_payments', 'has_active_investment')
 
     def get_username(self, obj):
         return getattr(obj.profile.user, 'username', '-') or '-'
     get_username.short_description = 'Kullanıcı'
-
-
-# Yardımcı fonksiyon: Özet güncelleme
-def update_user_investment_summary(profile):
-    summary, _ = UserInvestmentSummary.objects.get_or_create(profile=profile)
-    investments = profile.investments.filter(status=Investment.STATUS_APPROVED)
-
-    summary.total_invested = sum(inv.amount for inv in investments)
-    summary.total_return = sum(inv.expected_return for inv in investments)
-    summary.pending_payments = profile.investments.filter(status=Investment.STATUS_PENDING).count()
-    summary.has_active_investment = investments.exists()
-    summary.save()
@@ -1,8 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
 
-def ready(self):
-    import core.signals
\ No newline at end of file
+    def ready(self):
+        from .search import restore_search_triggers
+
+        post_migrate.connect(restore_search_triggers, sender=self)
@@ -0,0 +1,112 @@
+import base64
+import hashlib
+import io
+import os
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+RESPONSIVE_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+RESPONSIVE_IMAGE_WIDTHS = (160, 480, 960, 1920)
+IMAGE_FORMATS = {
+    'avif': {'quality': 50},
+    'webp': {'quality': 80},
+}
+
+# static/vendor/ altındaki üçüncü parti dosyalar: static yolu -> (kaynak adresi, SRI özeti).
+# Adresler sürüm içerir; `manage.py vendor_static` eksik dosyaları indirir ve özetleri
+# doğrular. Özeti henüz kaydedilmemiş (None) dosyalar için komut hesapladığı özeti yazar,
+# buraya eklenmelidir. Listedeki bir dosya static/ altında yoksa collectstatic hata verir.
+VENDOR_ASSETS = {
+    'vendor/bootstrap/bootstrap.min.css': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+        'sha384-9ndCyUaIbzAi2FUVXJi0CjmCapSmO7SnpJef0486qhLnuZ2cdeRhO02iuK6FUUVM',
+    ),
+    'vendor/bootstrap/bootstrap.bundle.min.js': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+        'sha384-geWF76RCwLtnZ8qwWowPQNguL3RmwHVBC9FhGdlKrxdiJJigb/j/68SIy3Te4Bkz',
+    ),
+    'vendor/bootstrap-icons/bootstrap-icons.css': (
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.5/font/bootstrap-icons.css', None,
+    ),
+    'vendor/bootstrap-icons/fonts/bootstrap-icons.woff2': (
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.5/font/fonts/bootstrap-icons.woff2', None,
+    ),
+    'vendor/bootstrap-icons/fonts/bootstrap-icons.woff': (
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.5/font/fonts/bootstrap-icons.woff', None,
+    ),
+    'vendor/aos/aos.css': ('https://cdn.jsdelivr.net/npm/aos@2.3.4/dist/aos.css', None),
+    'vendor/aos/aos.js': ('https://cdn.jsdelivr.net/npm/aos@2.3.4/dist/aos.js', None),
+    'vendor/barba/barba.umd.js': ('https://unpkg.com/@barba/core@2.9.7/dist/barba.umd.js', None),
+    'vendor/gsap/gsap.min.js': ('https://cdn.jsdelivr.net/npm/gsap@3.12.2/dist/gsap.min.js', None),
+    'vendor/chart.js/chart.umd.js': ('https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.js', None),
+}
+
+
+def subresource_integrity(data):
+    """SRI biçiminde SHA-384 özeti: 'sha384-<base64>'"""
+    return 'sha384-' + base64.b64encode(hashlib.sha384(data).digest()).decode()
+
+
+
+def image_widths():
+    return getattr(settings, 'RESPONSIVE_IMAGE_WIDTHS', RESPONSIVE_IMAGE_WIDTHS)
+
+
+def variant_name(path, width, fmt):
+    """'images/hero-bg.jpeg', 480, 'webp' -> 'images/hero-bg-480w.webp'"""
+    return f'{os.path.splitext(path)[0]}-{width}w.{fmt}'
+
+
+def variant_pattern(path):
+    return re.compile(rf'^{re.escape(os.path.splitext(path)[0])}-(\d+)w\.(\w+)$')
+
+
+def available_formats():
+    from PIL import features
+    return [fmt for fmt in IMAGE_FORMATS if features.check(fmt)]
+
+
+def render_variants(source):
+    """
+    Açık bir görsel dosyasından (genişlik, format, bytes) üçlüleri üretir.
+    Orijinalden geniş varyant üretilmez; en büyük varyant orijinal genişliktedir.
+    """
+    from PIL import Image
+
+    image = Image.open(source)
+    image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.mode in ('P', 'LA') or 'transparency' in image.info else 'RGB')
+
+    widths = sorted({min(width, image.width) for width in image_widths()})
+    formats = available_formats()
+    for width in widths:
+        if width == image.width:
+            resized = image
+        else:
+            resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        for fmt in formats:
+            buffer = io.BytesIO()
+            resized.save(buffer, fmt.upper(), **IMAGE_FORMATS[fmt])
+            yield width, fmt, buffer.getvalue()
+
+
+def is_collected(path):
+    """Dosya collectstatic manifest'inde (staticfiles.json) var mı?"""
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', None)
+    return bool(hashed_files) and staticfiles_storage.clean_name(path) in hashed_files
+
+
+@lru_cache(maxsize=None)
+def collected_variants(path):
+    """Manifest'teki varyantlar: {format: [(genişlik, static yolu), ...]}, AVIF önce, küçükten büyüğe."""
+    pattern = variant_pattern(path)
+    variants = {}
+    for name in getattr(staticfiles_storage, 'hashed_files', {}):
+        match = pattern.match(name)
+        if match:
+            variants.setdefault(match.group(2), []).append((int(match.group(1)), name))
+    return {fmt: sorted(variants[fmt]) for fmt in IMAGE_FORMATS if fmt in variants}
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+USER_RELATED = ('profile__investment_summary',)
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_users(user_ids):
+    """Önbellekteki kullanıcıları siler; ilgili kayıtlar değiştiğinde çağrılır."""
+    if getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 0):
+        caches[settings.AUTH_USER_CACHE].delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+class ProfileBackend(ModelBackend):
+    """
+    Oturumdaki kullanıcıyı profili ve yatırım özetiyle birlikte tek JOIN'li sorguda
+    yükler; request.user.profile ve profile.investment_summary ek sorgu yapmaz.
+
+    AUTH_USER_CACHE_TIMEOUT > 0 ise sonuç AUTH_USER_CACHE'te kısa süre saklanır ve
+    User/Profile/UserInvestmentSummary değiştiğinde silinir (core.models). Birden çok
+    worker varsa önbellek paylaşımlı olmalıdır (Redis/Memcached); yerel bellekte bir
+    worker'daki silme diğerlerine ulaşmaz.
+    """
+
+    def get_user(self, user_id):
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 0)
+        if timeout:
+            cache = caches[settings.AUTH_USER_CACHE]
+            user = cache.get(user_cache_key(user_id))
+            if user is None:
+                user = self._load(user_id)
+                if user is not None:
+                    cache.set(user_cache_key(user_id), user, timeout)
+        else:
+            user = self._load(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    def _load(self, user_id):
+        UserModel = get_user_model()
+        try:
+            return UserModel._default_manager.select_related(*USER_RELATED).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
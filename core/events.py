@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import InvestmentEvent, ProjectionCheckpoint, UserInvestmentSummary
+
+
+def project_investment_summaries(events):
+    # Yalnızca son kontrol noktasından bu yana olayı olan profillerin özetleri yenilenir
+    UserInvestmentSummary.objects.rebuild(event['investment__profile_id'] for event in events)
+
+
+PROJECTIONS = {
+    'investment_summaries': project_investment_summaries,
+}
+
+
+def replay(name, chunk_size=1000, lag=timedelta(seconds=5), reset=False):
+    """
+    ProjectionCheckpoint'ten sonraki olayları sırayla projeksiyona uygular ve kontrol
+    noktasını her parçayla birlikte aynı transaction'da ilerletir.
+
+    Olay ID'leri commit sırasıyla değil INSERT sırasıyla verilir; henüz commit edilmemiş
+    bir olayın atlanmaması için son `lag` içindeki olaylar bir sonraki çalıştırmaya bırakılır.
+    """
+    project = PROJECTIONS[name]
+    checkpoint, _created = ProjectionCheckpoint.objects.get_or_create(name=name)
+    if reset:
+        checkpoint.last_event_id = 0
+
+    events = InvestmentEvent.objects.filter(created_at__lt=timezone.now() - lag).order_by('pk')
+    processed = 0
+    while True:
+        chunk = list(
+            events.filter(pk__gt=checkpoint.last_event_id)
+            .values('pk', 'investment_id', 'investment__profile_id', 'from_status', 'to_status', 'created_at')
+            [:chunk_size]
+        )
+        if not chunk:
+            break
+        with transaction.atomic():
+            project(chunk)
+            checkpoint.last_event_id = chunk[-1]['pk']
+            checkpoint.save(update_fields=['last_event_id', 'updated_at'])
+        processed += len(chunk)
+    if reset and not processed:
+        checkpoint.save(update_fields=['last_event_id', 'updated_at'])
+    return processed
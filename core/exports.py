@@ -0,0 +1,207 @@
+import csv
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from itertools import chain
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+
+from .models import Investment, PaymentConfirmation
+from .returns import with_returns
+
+CHUNK_SIZE = 2000
+
+# (başlık, values_list alanı) çiftleri; ilişkili alanlar tek JOIN'li sorguda gelir
+INVESTMENT_COLUMNS = [
+    ('ID', 'id'),
+    ('Kullanıcı', 'profile__user__username'),
+    ('Email', 'profile__user__email'),
+    ('Paket', 'package__name'),
+    ('Tutar', 'amount'),
+    ('Beklenen Getiri', 'expected_return'),
+    ('Durum', 'status'),
+    ('Oluşturulma', 'created_at'),
+    ('Onay Tarihi', 'approved_at'),
+    ('Vade Tarihi', 'matures_at'),
+    ('İptal Tarihi', 'cancelled_at'),
+    ('İade Tarihi', 'refunded_at'),
+]
+
+CONFIRMATION_COLUMNS = [
+    ('ID', 'id'),
+    ('Yatırım ID', 'investment_id'),
+    ('Kullanıcı', 'investment__profile__user__username'),
+    ('Email', 'investment__profile__user__email'),
+    ('Paket', 'investment__package__name'),
+    ('Tutar', 'investment__amount'),
+    ('WhatsApp', 'whatsapp_number'),
+    ('Admin Onayı', 'admin_approved'),
+    ('Onay Tarihi', 'admin_approved_at'),
+    ('Gönderilme', 'sent_at'),
+]
+
+EXPORTS = {
+    'investments': (Investment, INVESTMENT_COLUMNS, 'created_at'),
+    'confirmations': (PaymentConfirmation, CONFIRMATION_COLUMNS, 'sent_at'),
+}
+
+
+def filter_export(kind, queryset=None, status=None, package=None, since=None, until=None):
+    model, _columns, date_field = EXPORTS[kind]
+    queryset = model.objects.all() if queryset is None else queryset
+    prefix = '' if model is Investment else 'investment__'
+    if status:
+        queryset = queryset.filter(**{f'{prefix}status': status})
+    if package:
+        queryset = queryset.filter(**{f'{prefix}package': package})
+    if since:
+        queryset = queryset.filter(**{f'{date_field}__date__gte': since})
+    if until:
+        queryset = queryset.filter(**{f'{date_field}__date__lte': until})
+    return queryset
+
+
+def export_rows(kind, queryset):
+    """Başlık satırı ve sabit bellekle akan veri satırları."""
+    model, columns, _date_field = EXPORTS[kind]
+    if model is Investment:
+        queryset = with_returns(queryset)
+    header = [title for title, _field in columns]
+    rows = (
+        queryset.order_by('pk')
+        .values_list(*[field for _title, field in columns])
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    return header, rows
+
+
+# Bu karakterlerle başlayan metinleri Excel/LibreOffice formül olarak çalıştırır
+# (CSV/formula injection); başlarına ' eklenerek düz metin olarak açılmaları sağlanır
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ', timespec='seconds')
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_stream(header, rows):
+    writer = csv.writer(_Echo())
+    yield '\ufeff'  # Excel'in UTF-8'i tanıması için BOM
+    for row in chain([header], rows):
+        yield writer.writerow([_cell(value) for value in row])
+
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sayfa1" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        value = _cell(value)
+        if isinstance(value, bool):
+            cells.append(f'<c t="b"><v>{int(value)}</v></c>')
+        elif isinstance(value, (int, float, Decimal)):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            text = escape(_XML_ILLEGAL.sub('', str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row>{"".join(cells)}</row>'.encode()
+
+
+class _ZipBuffer:
+    """tell()/seek() olmadığı için zipfile akış (data descriptor) modunda yazar."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def xlsx_stream(header, rows):
+    """Harici kütüphane olmadan, satır satır üretilen tek sayfalık XLSX."""
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, xml in XLSX_PARTS.items():
+            archive.writestr(name, xml)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            for i, row in enumerate(chain([header], rows)):
+                sheet.write(_xlsx_row(row))
+                if i % CHUNK_SIZE == 0:
+                    yield buffer.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
+
+
+FORMATS = {
+    'csv': (csv_stream, 'text/csv; charset=utf-8'),
+    'xlsx': (xlsx_stream, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def export_response(kind, queryset, fmt='csv'):
+    stream, content_type = FORMATS[fmt]
+    header, rows = export_rows(kind, queryset)
+    response = StreamingHttpResponse(stream(header, rows), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{kind}-{datetime.now():%Y%m%d-%H%M}.{fmt}"'
+    return response
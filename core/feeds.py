@@ -0,0 +1,177 @@
+"""
+Yöneticilere yeni ve değişen ödeme onaylarını Server-Sent Events ile iten akış.
+
+Süreç başına tek bir Poller çalışır: bağlı tarayıcı sayısından bağımsız olarak her
+POLL_INTERVAL'da veritabanına (updated_at, id) yüksek su işaretinden sonrasını
+isteyen tek, indeksli bir sorgu gider; sonuç tüm abonelerin kuyruklarına dağıtılır.
+Akış yalnızca ASGI altında açık tutulur; WSGI'da (gunicorn gthread) her bağlantı bir
+thread'i kilitlerdi. Orada snapshot() kullanılır: yanıt o ana kadarki değişikliklerle
+hemen kapanır, tarayıcı `retry` kadar sonra Last-Event-ID ile yeniden sorar (kısa yoklama).
+"""
+import asyncio
+import json
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import PaymentConfirmation
+
+POLL_INTERVAL = 2
+# updated_at commit'ten önce verilir; son LAG içindeki satırlar henüz commit edilmemiş
+# olabileceğinden bir sonraki tura bırakılır (aksi halde işaretin gerisinde kalıp kaybolurlar)
+LAG = timedelta(seconds=2)
+BATCH_SIZE = 200
+HEARTBEAT = 15
+# Bağlantı bu süreden sonra kapatılır; tarayıcı Last-Event-ID ile kaldığı yerden bağlanır
+MAX_CONNECTION = 300
+QUEUE_SIZE = 100
+
+FIELDS = (
+    'pk', 'updated_at', 'sent_at', 'admin_approved', 'possible_duplicate_id',
+    'investment__amount', 'investment__package__name', 'investment__profile__user__username',
+)
+
+
+def _mark(row):
+    return row['updated_at'], row['pk']
+
+
+def _parse_mark(event_id):
+    updated_at, _sep, pk = (event_id or '').partition('|')
+    updated_at = parse_datetime(updated_at)
+    if updated_at is None or not pk.isdigit():
+        return None
+    return updated_at, int(pk)
+
+
+def _settled():
+    return PaymentConfirmation.objects.filter(updated_at__lte=timezone.now() - LAG)
+
+
+async def changes_since(mark):
+    queryset = _settled()
+    if mark is not None:
+        updated_at, pk = mark
+        queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk))
+    return [row async for row in queryset.order_by('updated_at', 'pk').values(*FIELDS)[:BATCH_SIZE]]
+
+
+async def current_mark():
+    row = await _settled().order_by('-updated_at', '-pk').values('updated_at', 'pk').afirst()
+    return row and _mark(row)
+
+
+class Poller:
+    """Abone olduğu sürece çalışan, süreç genelinde paylaşılan tek sorgu döngüsü."""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done() or self.task.get_loop() is not asyncio.get_running_loop():
+            self.task = asyncio.create_task(self.run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def run(self):
+        mark = await current_mark()
+        while self.subscribers:
+            rows = await changes_since(mark)
+            if rows:
+                mark = _mark(rows[-1])
+                for queue in list(self.subscribers):
+                    try:
+                        queue.put_nowait(rows)
+                    except asyncio.QueueFull:
+                        # Yetişemeyen bağlantı kapatılır; tarayıcı Last-Event-ID ile yeniden bağlanır
+                        self.unsubscribe(queue)
+                        queue.get_nowait()
+                        queue.put_nowait(None)
+            if len(rows) < BATCH_SIZE:
+                await asyncio.sleep(POLL_INTERVAL)
+
+
+poller = Poller()
+
+
+def _event(row):
+    data = {
+        'id': row['pk'],
+        'username': row['investment__profile__user__username'],
+        'package': row['investment__package__name'],
+        'amount': row['investment__amount'],
+        'admin_approved': row['admin_approved'],
+        'possible_duplicate': row['possible_duplicate_id'],
+        'sent_at': row['sent_at'],
+        'url': reverse('admin:core_paymentconfirmation_change', args=[row['pk']]),
+    }
+    return f'id: {_event_id(_mark(row))}\nevent: confirmation\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+def _event_id(mark):
+    updated_at, pk = mark
+    return f'{updated_at.isoformat()}|{pk}'
+
+
+async def snapshot(last_event_id=None):
+    """
+    WSGI için tek seferlik SSE gövdesi. İlk bağlantıda yalnızca güncel işaret `id:` olarak
+    gönderilir (veri içermeyen olay tarayıcıda Last-Event-ID'yi ayarlar); sonraki
+    bağlantılarda o işaretten sonraki değişiklikler döner.
+    """
+    body = f'retry: {POLL_INTERVAL * 1000}\n\n'
+    last = _parse_mark(last_event_id)
+    if last is None:
+        mark = await current_mark() or (timezone.now() - LAG, 0)
+        return body + f'id: {_event_id(mark)}\n\n'
+    rows = await changes_since(last)
+    if not rows:
+        # Tarayıcı Last-Event-ID'yi saklar; aynı işaret tekrar gönderilmez
+        return body
+    return body + ''.join(_event(row) for row in rows)
+
+
+async def stream(last_event_id=None):
+    """
+    SSE gövdesi. Last-Event-ID verilmişse önce aradaki değişiklikler bu bağlantı için
+    tamamlanır; sonrası paylaşılan Poller'dan gelir. İkisinin kesiştiği satırlar
+    (updated_at, id) sırasına göre bir kez gönderilir.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + MAX_CONNECTION
+    queue = poller.subscribe()
+    try:
+        yield f'retry: {POLL_INTERVAL * 1000}\n\n'
+        last = _parse_mark(last_event_id)
+        if last is not None:
+            while rows := await changes_since(last):
+                for row in rows:
+                    yield _event(row)
+                last = _mark(rows[-1])
+                if len(rows) < BATCH_SIZE:
+                    break
+
+        while (timeout := deadline - loop.time()) > 0:
+            try:
+                rows = await asyncio.wait_for(queue.get(), min(HEARTBEAT, timeout))
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if rows is None:
+                break
+            for row in rows:
+                if last is not None and _mark(row) <= last:
+                    continue
+                yield _event(row)
+                last = _mark(row)
+    finally:
+        poller.unsubscribe(queue)
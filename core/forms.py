@@ -1,8 +1,21 @@
 import re
+import secrets
 from django import forms
-from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
+from django.contrib.auth.forms import UserChangeForm, UserCreationForm, AuthenticationForm
 from django.contrib.auth.models import User
-from .models import Investment, PaymentConfirmation
+from django.db.models import Value
+from django.db.models.functions import Lower
+from .models import Investment, PaymentConfirmation, USER_EMAIL_KEY
+
+
+def email_taken(email, exclude_pk=None):
+    """core_user_email_ci_uniq indeksinin reddedeceği (büyük/küçük harf duyarsız) e-posta var mı?"""
+    if not email:
+        return False
+    users = User.objects.alias(email_key=USER_EMAIL_KEY).filter(email_key=Lower(Value(email)))
+    if exclude_pk is not None:
+        users = users.exclude(pk=exclude_pk)
+    return users.exists()
 
 
 class RegisterForm(UserCreationForm):
@@ -40,11 +53,20 @@ class RegisterForm(UserCreationForm):
 
     def clean_email(self):
         email = self.cleaned_data.get('email')
-        if email and User.objects.filter(email__iexact=email).exists():
+        if email_taken(email):
             raise forms.ValidationError("Bu email zaten kayıtlı.")
         return email
 
 
+class AdminUserChangeForm(UserChangeForm):
+    # Aynı e-postanın farklı yazımı indekse takılıp 500 vermesin, formda hata olarak dönsün
+    def clean_email(self):
+        email = self.cleaned_data.get('email')
+        if email_taken(email, exclude_pk=self.instance.pk):
+            raise forms.ValidationError("Bu email başka bir kullanıcıda kayıtlı.")
+        return email
+
+
 class LoginForm(AuthenticationForm):
     username = forms.CharField(
         label="Kullanıcı Adı",
@@ -70,6 +92,8 @@ class InvestmentForm(forms.ModelForm):
         required=True,
         error_messages={'required': 'Lütfen yatırım şartlarını kabul edin.'}
     )
+    # Her form gösteriminde yeni üretilir; tekrarlanan gönderimler aynı anahtarı taşır
+    idempotency_key = forms.CharField(widget=forms.HiddenInput(), max_length=64)
 
     class Meta:
         model = Investment
@@ -87,6 +111,8 @@ class InvestmentForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self._profile = profile
         self._package = package
+        if not self.is_bound:
+            self.initial.setdefault('idempotency_key', secrets.token_urlsafe(32))
 
 
 
@@ -136,6 +162,12 @@ class PaymentConfirmationForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self.fields['investment'].widget = forms.HiddenInput()
 
+    def validate_unique(self):
+        # Yatırım başına tek onay kuralını veritabanı (OneToOne) uygular; view yatırım
+        # satırını kilitleyip kontrol eder ve IntegrityError'ı yakalar. Burada kilitsiz
+        # bir SELECT yarışı önlemez.
+        pass
+
     def clean_whatsapp_number(self):
         number = self.cleaned_data.get('whatsapp_number')
         if number:
@@ -156,3 +188,14 @@ class PaymentConfirmationForm(forms.ModelForm):
         else:
             raise forms.ValidationError("Ödeme dekontu yüklemek zorunludur.")
         return file
+
+
+class CSVImportForm(forms.Form):
+    KIND_CHOICES = [
+        ('packages', 'Paketler'),
+        ('wallets', 'Kripto Cüzdanlar'),
+        ('investments', 'Yatırımlar'),
+    ]
+
+    kind = forms.ChoiceField(label='Veri Türü', choices=KIND_CHOICES)
+    csv_file = forms.FileField(label='CSV Dosyası', widget=forms.ClearableFileInput(attrs={'accept': '.csv,text/csv'}))
@@ -0,0 +1,257 @@
+import csv
+from dataclasses import dataclass, field
+from decimal import Decimal
+from itertools import islice
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .models import CryptoWallet, Investment, InvestmentEvent, Package, Profile, UserInvestmentSummary
+from .returns import expected_return
+
+CHUNK_SIZE = 500
+
+
+class PackageImportForm(forms.ModelForm):
+    class Meta:
+        model = Package
+        fields = ['name', 'price', 'duration_days', 'profit_percent']
+
+
+class CryptoWalletImportForm(forms.ModelForm):
+    BOOLEAN_VALUES = {'': True, '1': True, 'true': True, 'evet': True, '0': False, 'false': False, 'hayır': False}
+
+    active = forms.CharField(required=False)
+
+    class Meta:
+        model = CryptoWallet
+        fields = ['name', 'address', 'network', 'active']
+
+    def clean_active(self):
+        value = self.cleaned_data['active'].lower()
+        if value not in self.BOOLEAN_VALUES:
+            raise forms.ValidationError("1/0, true/false veya evet/hayır olmalı.")
+        return self.BOOLEAN_VALUES[value]
+
+
+class InvestmentImportForm(forms.Form):
+    username = forms.CharField()
+    package = forms.CharField(help_text="Paket ID veya adı")
+    amount = forms.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    status = forms.ChoiceField(choices=Investment.STATUS_CHOICES, required=False)
+    created_at = forms.DateTimeField(required=False)
+    approved_at = forms.DateTimeField(required=False)
+    cancelled_at = forms.DateTimeField(required=False)
+    refunded_at = forms.DateTimeField(required=False)
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    errors: list = field(default_factory=list)  # (satır no, mesaj)
+    profile_ids: set = field(default_factory=set)
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+def _format_errors(errors):
+    return '; '.join(
+        f"{name}: {' '.join(messages)}" if name != '__all__' else ' '.join(messages)
+        for name, messages in errors.items()
+    )
+
+
+def _clean_fields(form_class, row):
+    """
+    Satırı form örneği oluşturmadan alan alan doğrular. Her form örneği alanlarını
+    deepcopy ile kopyaladığından büyük dosyalarda bu maliyet baskın hale gelir.
+    """
+    data, errors = {}, {}
+    for name, field in form_class.base_fields.items():
+        try:
+            data[name] = field.clean(row.get(name, ''))
+        except ValidationError as exc:
+            errors[name] = exc.messages
+    return data, errors
+
+
+def _build_simple(form_class):
+    def build(rows, report, context):
+        objs = []
+        for line, row in rows:
+            form = form_class(row)
+            if form.is_valid():
+                objs.append((line, form.save(commit=False)))
+            else:
+                report.error(line, _format_errors(form.errors))
+        return objs
+    return build
+
+
+def _investment_context():
+    # Paket tablosu küçük: ID ve ad ile bir kez belleğe alınır
+    packages = {}
+    for package in Package.objects.all():
+        packages.setdefault(package.name.strip().lower(), package)
+        packages[str(package.pk)] = package
+    return {'packages': packages}
+
+
+def _build_investments(rows, report, context):
+    valid = []
+    for line, row in rows:
+        data, errors = _clean_fields(InvestmentImportForm, row)
+        if errors:
+            report.error(line, _format_errors(errors))
+        else:
+            valid.append((line, data))
+
+    # Parça içindeki kullanıcı adları tek sorguda çözülür
+    usernames = {data['username'] for _line, data in valid}
+    profiles = dict(
+        Profile.objects.filter(user__username__in=usernames).values_list('user__username', 'pk')
+    )
+
+    now = timezone.now()
+    objs = []
+    for line, data in valid:
+        profile_id = profiles.get(data['username'])
+        package = context['packages'].get(data['package'].strip().lower())
+        if profile_id is None:
+            report.error(line, f"username: '{data['username']}' kullanıcısı bulunamadı.")
+            continue
+        if package is None:
+            report.error(line, f"package: '{data['package']}' paketi bulunamadı.")
+            continue
+
+        status = data['status'] or Investment.STATUS_PENDING
+        created_at = data['created_at'] or now
+        investment = Investment(
+            profile_id=profile_id,
+            package=package,
+            amount=data['amount'],
+            expected_return=expected_return(data['amount'], package.profit_percent),
+            status=status,
+        )
+        # Investment.save() çağrılmadığı için zaman damgaları burada tamamlanır
+        investment.created_at = created_at
+        if status == Investment.STATUS_APPROVED:
+            investment.approved_at = data['approved_at'] or created_at
+        elif status == Investment.STATUS_CANCELLED:
+            investment.cancelled_at = data['cancelled_at'] or created_at
+        elif status == Investment.STATUS_REFUNDED:
+            investment.refunded_at = data['refunded_at'] or created_at
+        objs.append((line, investment))
+    return objs
+
+
+def _bulk_create(model, instances):
+    if model is not Investment:
+        model.objects.bulk_create(instances)
+        return
+    # auto_now_add, bulk_create sırasında created_at'i ezer; geçmiş tarihler geri
+    # yazılır. bulk_update'in CASE ifadesi yerine executemany çok daha ucuz.
+    history = [obj.created_at for obj in instances]
+    model.objects.bulk_create(instances)
+    field = model._meta.get_field('created_at')
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'UPDATE {qn(model._meta.db_table)} SET {qn(field.column)} = %s WHERE {qn(model._meta.pk.column)} = %s',
+            [(field.get_db_prep_save(created_at, connection), obj.pk) for obj, created_at in zip(instances, history)],
+        )
+    for obj, created_at in zip(instances, history):
+        obj.created_at = created_at
+    # Investment.save() atlandığı için durum olayları da toplu yazılır; 0026'daki geri
+    # doldurma gibi oluşturma ve durum değişikliği, satırın kendi tarihleriyle damgalanır
+    events = []
+    for obj in instances:
+        events.append(InvestmentEvent(
+            investment=obj, from_status='', to_status=Investment.STATUS_PENDING, created_at=obj.created_at,
+        ))
+        if obj.status != Investment.STATUS_PENDING:
+            stamp = getattr(obj, Investment.TIMESTAMP_FIELDS[obj.status]) or obj.created_at
+            events.append(InvestmentEvent(
+                investment=obj, from_status=Investment.STATUS_PENDING, to_status=obj.status, created_at=stamp,
+            ))
+    InvestmentEvent.objects.bulk_create(events)
+
+
+# tür -> (model, zorunlu sütunlar, satır doğrulayıcı, bağlam)
+IMPORTS = {
+    'packages': (Package, ['name', 'price', 'duration_days', 'profit_percent'],
+                 _build_simple(PackageImportForm), dict),
+    'wallets': (CryptoWallet, ['name', 'address', 'network'],
+                _build_simple(CryptoWalletImportForm), dict),
+    'investments': (Investment, ['username', 'package', 'amount'],
+                    _build_investments, _investment_context),
+}
+
+
+def _insert(model, objs, report):
+    """Parçayı tek INSERT ile yazar; veritabanı reddederse satır satır dener."""
+    instances = [obj for _line, obj in objs]
+    try:
+        with transaction.atomic():
+            _bulk_create(model, instances)
+    except IntegrityError:
+        instances = []
+        for line, obj in objs:
+            obj.pk = None
+            try:
+                with transaction.atomic():
+                    _bulk_create(model, [obj])
+            except IntegrityError as exc:
+                report.error(line, str(exc))
+            else:
+                instances.append(obj)
+
+    report.created += len(instances)
+    if model is Investment:
+        report.profile_ids.update(obj.profile_id for obj in instances)
+
+
+def import_csv(kind, stream, chunk_size=CHUNK_SIZE):
+    """
+    CSV akışını parça parça doğrulayıp bulk_create ile yazar. Hatalı satırlar
+    raporlanır ve atlanır; geri kalan satırların içe aktarımı durmaz. Dosya okunamaz
+    hale gelirse (kodlama, CSV biçimi) bu da satır hatası olarak raporlanır; o ana kadar
+    yazılan parçalar kalır ve özetleri yine yenilenir.
+    """
+    model, required, build, make_context = IMPORTS[kind]
+    report = ImportReport()
+    reader = csv.DictReader(stream)
+    try:
+        header = [name.strip().lower() for name in reader.fieldnames or []]
+        missing = [name for name in required if name not in header]
+        if missing:
+            report.error(1, f"Eksik sütun(lar): {', '.join(missing)}")
+            return report
+        reader.fieldnames = header
+
+        context = make_context()
+
+        def numbered_rows():
+            for row in reader:
+                # Fazla sütunlar (anahtar None) yok sayılır
+                row = {key: (value or '').strip() for key, value in row.items() if key}
+                if any(row.values()):
+                    yield reader.line_num, row
+
+        rows = numbered_rows()
+        while chunk := list(islice(rows, chunk_size)):
+            objs = build(chunk, report, context)
+            if objs:
+                _insert(model, objs, report)
+    except UnicodeDecodeError:
+        # Metin blok blok çözüldüğünden satır numarası yaklaşıktır
+        report.error(reader.line_num + 1, "Dosya UTF-8 değil; Excel'de \"CSV UTF-8\" olarak kaydedip tekrar deneyin. Bu satırdan sonrası okunmadı.")
+    except csv.Error as exc:
+        report.error(reader.line_num, f"CSV biçim hatası: {exc}. Bu satırdan sonrası okunmadı.")
+    finally:
+        if report.profile_ids:
+            UserInvestmentSummary.objects.rebuild(report.profile_ids)
+    return report
@@ -0,0 +1,49 @@
+import argparse
+import sys
+
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from core.exports import EXPORTS, FORMATS, export_rows, filter_export
+from core.models import Investment
+
+
+def date_argument(value):
+    # parse_date biçim uymazsa None döner; filtre sessizce düşüp tüm tablo aktarılmasın
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"'{value}' geçerli bir tarih değil (YYYY-AA-GG).")
+    return parsed
+
+
+class Command(BaseCommand):
+    help = "Yatırımları veya ödeme onaylarını CSV/XLSX olarak sabit bellekle dışa aktarır."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--status', choices=[value for value, _label in Investment.STATUS_CHOICES])
+        parser.add_argument('--package', type=int, help="Paket ID")
+        parser.add_argument('--since', type=date_argument, help="YYYY-AA-GG (dahil)")
+        parser.add_argument('--until', type=date_argument, help="YYYY-AA-GG (dahil)")
+        parser.add_argument('-o', '--output', help="Dosya yolu (varsayılan: stdout)")
+
+    def handle(self, *args, **options):
+        kind = options['kind']
+        queryset = filter_export(
+            kind, status=options['status'], package=options['package'],
+            since=options['since'], until=options['until'],
+        )
+        stream = FORMATS[options['format']][0]
+        header, rows = export_rows(kind, queryset)
+
+        out = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for chunk in stream(header, rows):
+                out.write(chunk.encode() if isinstance(chunk, str) else chunk)
+        finally:
+            if options['output']:
+                out.close()
@@ -0,0 +1,75 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.functions import Collate
+from django.template.defaultfilters import filesizeformat
+
+from core.models import PaymentConfirmation
+from core.storage import ORPHAN_GRACE, recently_written
+
+
+class Command(BaseCommand):
+    help = (
+        "Hiçbir PaymentConfirmation kaydının kullanmadığı dekont dosyalarını bulur. "
+        "Depolamadaki dosyalar ve veritabanı sıralı olarak yan yana okunur; liste belleğe alınmaz."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help="Sahipsiz dosyaları sil (varsayılan: yalnızca raporla).")
+        parser.add_argument(
+            '--grace-minutes', type=int, default=ORPHAN_GRACE // timedelta(minutes=1),
+            help="Bu süreden yeni dosyalara dokunma (kaydı henüz commit edilmemiş yüklemeler).",
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        field = PaymentConfirmation._meta.get_field('payment_screenshot')
+        storage = field.storage
+        prefix = field.upload_to.rstrip('/') + '/'
+
+        name = 'payment_screenshot'
+        if connection.vendor == 'postgresql':
+            # Python'daki str sıralamasıyla aynı olması için bayt sıralı collation
+            name = Collate(name, 'C')
+        referenced = (
+            PaymentConfirmation.objects.exclude(payment_screenshot='')
+            .filter(payment_screenshot__startswith=prefix)
+            .order_by(name)
+            .values_list('payment_screenshot', flat=True)
+            .iterator(chunk_size=options['chunk_size'])
+        )
+
+        cutoff = time.time() - options['grace_minutes'] * 60
+        orphans = reclaimed = kept = 0
+        current = next(referenced, None)
+        for path, size, modified in storage.list_files(prefix):
+            while current is not None and current < path:
+                current = next(referenced, None)
+            if current == path:
+                kept += 1
+                continue
+            if modified > cutoff:
+                continue
+            if options['delete']:
+                # Tarama sırasında aynı içerik yeniden yüklenmiş olabilir: silmeden hemen önce
+                # referans ve dosya zamanı tekrar kontrol edilir
+                with transaction.atomic():
+                    if (
+                        PaymentConfirmation.objects.filter(payment_screenshot=path).exists()
+                        or recently_written(storage, path, timedelta(minutes=options['grace_minutes']))
+                    ):
+                        kept += 1
+                        continue
+                    storage.delete(path)
+            elif options['verbosity'] > 1:
+                self.stdout.write(path)
+            orphans += 1
+            reclaimed += size
+
+        if options['delete']:
+            message = f"{orphans} sahipsiz dosya silindi, {filesizeformat(reclaimed)} yer açıldı."
+        else:
+            message = f"{orphans} sahipsiz dosya bulundu ({filesizeformat(reclaimed)}); silmek için --delete kullanın."
+        self.stdout.write(self.style.SUCCESS(f"{kept} dosya kullanımda. {message}"))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from core.models import PaymentConfirmation
+
+
+class Command(BaseCommand):
+    help = (
+        "Algısal özeti olmayan dekontların özetini hesaplar ve her birini kendisinden önce "
+        "gönderilmiş dekontlarla karşılaştırarak olası mükerrerleri işaretler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Özeti olanlar dahil tüm dekontları yeniden hesapla.")
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        queryset = PaymentConfirmation.objects.exclude(payment_screenshot='')
+        if not options['all']:
+            queryset = queryset.filter(screenshot_hash='')
+
+        # Eskiden yeniye gidilir; her dekont yalnızca kendinden öncekilerle karşılaştırılır
+        last_pk = hashed = flagged = unreadable = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk).order_by('pk').only('pk', 'payment_screenshot')[:options['chunk_size']])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            for confirmation in chunk:
+                try:
+                    confirmation.update_screenshot_hash(PaymentConfirmation.objects.filter(pk__lt=confirmation.pk))
+                except FileNotFoundError:
+                    unreadable += 1
+                    continue
+                finally:
+                    confirmation.payment_screenshot.close()
+                if not confirmation.screenshot_hash:
+                    unreadable += 1
+                    continue
+                confirmation.save(update_fields=PaymentConfirmation.SCREENSHOT_HASH_FIELDS)
+                hashed += 1
+                flagged += confirmation.possible_duplicate_id is not None
+            self.stdout.write(f"{hashed} dekont işlendi...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{hashed} dekontun özeti hesaplandı, {flagged} olası mükerrer işaretlendi, {unreadable} dosya okunamadı."
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.imports import CHUNK_SIZE, IMPORTS, import_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "Paket, cüzdan veya geçmiş yatırımları CSV'den toplu olarak içe aktarır. "
+        "Satırlar parça parça doğrulanıp bulk_create ile yazılır; hatalı satırlar raporlanıp atlanır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTS))
+        parser.add_argument('path', help="UTF-8 CSV dosyası (ilk satır başlık)")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            report = import_csv(options['kind'], stream, chunk_size=options['chunk_size'])
+
+        for line, message in report.errors:
+            self.stderr.write(f"Satır {line}: {message}")
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(f"{report.created} kayıt eklendi, {len(report.errors)} satır atlandı."))
@@ -0,0 +1,75 @@
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Yeni bir süreçte gunicorn'un yaptığı gibi WSGI uygulaması yüklenir, ardından ısınma
+# çalışır; süreler stdout'a, -X importtime çıktısı stderr'e yazılır
+SCRIPT = """
+import time
+start = time.perf_counter()
+import {module}
+loaded = time.perf_counter()
+timings = {{}}
+if {warm_up}:
+    from core.warmup import warm_up
+    timings = warm_up()
+print(round((loaded - start) * 1000, 1), round((time.perf_counter() - loaded) * 1000, 1), timings)
+"""
+
+
+def parse_importtime(output):
+    """`-X importtime` satırlarından (modül, kendi süresi µs, toplam süre µs) listesi."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue  # başlık satırı
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "WSGI uygulamasının soğuk açılışını yeni bir `python -X importtime` sürecinde ölçer; "
+        "paket bazında ve en yavaş modüllere göre import sürelerini, ısınma adımlarının süresini raporlar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help="Listelenecek en yavaş modül sayısı.")
+        parser.add_argument(
+            '--module', default=settings.WSGI_APPLICATION.rpartition('.')[0],
+            help="Yüklenecek modül (varsayılan: WSGI_APPLICATION'ın modülü).",
+        )
+        parser.add_argument('--no-warm-up', action='store_true', help="core.warmup adımlarını çalıştırma.")
+
+    def handle(self, *args, **options):
+        script = SCRIPT.format(module=options['module'], warm_up=not options['no_warm_up'])
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        load_ms, warm_up_ms, timings = result.stdout.split(maxsplit=2)
+
+        rows = parse_importtime(result.stderr)
+        packages = defaultdict(int)
+        for name, self_us, _cumulative in rows:
+            packages[name.partition('.')[0]] += self_us
+        total_us = sum(packages.values())
+
+        self.stdout.write(f"{options['module']} yüklenmesi: {load_ms} ms ({len(rows)} modül, import: {total_us / 1000:.1f} ms)")
+        self.stdout.write(f"Isınma: {warm_up_ms} ms {timings.strip()}")
+
+        self.stdout.write("\nPaket bazında (kendi süreleri toplamı):")
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['limit']]:
+            self.stdout.write(f"  {self_us / 1000:8.1f} ms  {self_us * 100 / total_us:5.1f}%  {package}")
+
+        self.stdout.write("\nEn yavaş modüller (kendi / alt modüllerle birlikte):")
+        for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[1])[:options['limit']]:
+            self.stdout.write(f"  {self_us / 1000:8.1f} ms  {cumulative_us / 1000:8.1f} ms  {name}")
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = (
+        "Yatırım formlarının tekrar gönderimini yakalamak için tutulan eski anahtarları "
+        "parçalar halinde siler. Süresi geçen bir formun yeniden gönderimi yeni yatırım oluşturur."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Bu süreden eski anahtarlar silinir.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        batch_size = options['batch_size']
+        total = 0
+        while True:
+            ids = list(IdempotencyKey.objects.filter(created_at__lt=cutoff).values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted, _ = IdempotencyKey.objects.filter(pk__in=ids).delete()
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(f"{total} eski tekrar gönderim anahtarı silindi."))
@@ -0,0 +1,36 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Süresi dolmuş oturumları tabloyu uzun süre kilitlemeden parçalar halinde siler."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            # signed_cookies gibi veritabanı kullanmayan motorlar
+            store.clear_expired()
+            self.stdout.write("Oturum motoru veritabanı kullanmıyor, silinecek kayıt yok.")
+            return
+
+        session_model = store.get_model_class()
+        batch_size = options['batch_size']
+        now = timezone.now()
+        total = 0
+        while True:
+            keys = list(
+                session_model.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            deleted, _ = session_model.objects.filter(session_key__in=keys).delete()
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(f"{total} süresi dolmuş oturum silindi."))
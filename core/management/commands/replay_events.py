@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.events import PROJECTIONS, replay
+
+
+class Command(BaseCommand):
+    help = (
+        "Yatırım olaylarını son kontrol noktasından itibaren projeksiyonlara uygular. "
+        "Tüm yatırımları yeniden taramak yerine yalnızca yeni olayları işler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('projections', nargs='*', help=f"{', '.join(sorted(PROJECTIONS))} (varsayılan: tümü)")
+        parser.add_argument('--reset', action='store_true', help="Kontrol noktasını sıfırla ve baştan uygula.")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        unknown = set(options['projections']) - set(PROJECTIONS)
+        if unknown:
+            raise CommandError(f"Bilinmeyen projeksiyon: {', '.join(sorted(unknown))}")
+        for name in options['projections'] or sorted(PROJECTIONS):
+            processed = replay(name, chunk_size=options['chunk_size'], reset=options['reset'])
+            self.stdout.write(f"{name}: {processed} olay işlendi.")
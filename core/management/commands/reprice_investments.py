@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Package
+from core.returns import reprice_pending_investments
+
+
+class Command(BaseCommand):
+    help = (
+        "Paketlerin güncel getiri oranıyla bekleyen yatırımların expected_return "
+        "değerini parça parça yeniden hesaplar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('package_ids', nargs='*', type=int, help="Paket ID'leri (varsayılan: tümü)")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        packages = Package.objects.order_by('pk')
+        if options['package_ids']:
+            packages = packages.filter(pk__in=options['package_ids'])
+            missing = set(options['package_ids']) - set(packages.values_list('pk', flat=True))
+            if missing:
+                raise CommandError(f"Paket bulunamadı: {', '.join(map(str, sorted(missing)))}")
+
+        for package in packages:
+            updated = reprice_pending_investments(package, chunk_size=options['chunk_size'])
+            self.stdout.write(f"{package.name}: %{package.profit_percent} ile {updated} yatırım güncellendi.")
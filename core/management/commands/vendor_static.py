@@ -0,0 +1,52 @@
+from pathlib import Path
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.assets import VENDOR_ASSETS, subresource_integrity
+
+
+class Command(BaseCommand):
+    help = (
+        "Şablonlarda kullanılan üçüncü parti dosyaları static/ altına indirir ve SRI özetlerini "
+        "doğrular (bkz. core.assets.VENDOR_ASSETS)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Mevcut dosyaları yeniden indir.")
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        unrecorded = []
+        for path, (url, integrity) in VENDOR_ASSETS.items():
+            target = static_dir / path
+            if target.exists() and not options['force']:
+                data = target.read_bytes()
+                source = "mevcut"
+            else:
+                try:
+                    with urlopen(Request(url, headers={'User-Agent': 'wafelinvest-vendor'}), timeout=30) as response:
+                        data = response.read()
+                except OSError as exc:
+                    raise CommandError(f"{url} indirilemedi: {exc}")
+                source = url
+
+            digest = subresource_integrity(data)
+            if integrity is None:
+                unrecorded.append((path, digest))
+            elif digest != integrity:
+                raise CommandError(
+                    f"{path} ({source}) özeti kayıtlı değerle uyuşmuyor: {digest} != {integrity}"
+                    + ("" if source == url else ". Yeniden indirmek için --force verin.")
+                )
+            if source == url:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(data)
+                self.stdout.write(self.style.SUCCESS(f"{path} <- {url} ({len(data)} bayt)"))
+            else:
+                self.stdout.write(f"{path} zaten mevcut, özeti doğrulandı." if integrity else f"{path} zaten mevcut.")
+
+        for path, digest in unrecorded:
+            self.stdout.write(self.style.WARNING(f"{path} için özet kayıtlı değil; VENDOR_ASSETS'e ekleyin: '{digest}'"))
+        self.stdout.write("Hash'li kopyalar için `manage.py collectstatic` çalıştırın.")
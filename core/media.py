@@ -0,0 +1,99 @@
+import mimetypes
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def serve_protected(request, fieldfile):
+    """
+    Yetki kontrolü yapılmış bir dosyayı sunar. MEDIA_ACCEL_BACKEND ayarlıysa byte
+    aktarımı ön sunucuya (nginx X-Accel-Redirect / Apache X-Sendfile) bırakılır;
+    değilse Range ve koşullu istek destekli FileResponse ile akıtılır.
+    """
+    backend = getattr(settings, 'MEDIA_ACCEL_BACKEND', None)
+    content_type = mimetypes.guess_type(fieldfile.name)[0] or 'application/octet-stream'
+
+    if backend == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(posixpath.join(settings.MEDIA_ACCEL_PREFIX, fieldfile.name))
+        return _private(response)
+    try:
+        path = fieldfile.path
+    except NotImplementedError:
+        # Yerel yolu olmayan depolama (ör. S3): imzalı URL'e yönlendir
+        return HttpResponseRedirect(fieldfile.url)
+    if backend == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return _private(response)
+
+    storage = fieldfile.storage
+    size = storage.size(fieldfile.name)
+    last_modified = storage.get_modified_time(fieldfile.name).timestamp()
+    etag = f'"{int(last_modified):x}-{size:x}"'
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if response is not None:
+        return _private(response)
+
+    byte_range = _parse_range(request, etag, last_modified, size)
+    if byte_range == 'invalid':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return _private(response)
+
+    f = storage.open(fieldfile.name, 'rb')
+    if byte_range is None:
+        response = FileResponse(f, content_type=content_type)
+    else:
+        start, end = byte_range
+        f.seek(start)
+        response = StreamingHttpResponse(_read_range(f, end - start + 1), status=206, content_type=content_type)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return _private(response)
+
+
+def _private(response):
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
+
+
+def _parse_range(request, etag, last_modified, size):
+    """Tek aralıklı 'bytes=a-b' başlığını (start, end) olarak döner; yoksa None."""
+    header = request.META.get('HTTP_RANGE', '').strip()
+    match = RANGE_RE.match(header)
+    if not match or not any(match.groups()):
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range not in (etag, http_date(last_modified)):
+        return None
+
+    first, last = match.groups()
+    if not first:  # son N byte
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return 'invalid'
+    return start, end
+
+
+def _read_range(f, remaining):
+    with f:
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # Brotli kurulu değilse yalnızca gzip kullanılır
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+# Dinamik yanıtlarda sıkıştırma süresi TTFB'ye eklenir; 11 yerine hızlı bir seviye
+BROTLI_QUALITY = 5
+FLUSH_SIZE = 16 * 1024
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Metin yanıtlarını Brotli veya gzip ile sıkıştırır; akış yanıtlarında her parça
+    geldiği gibi sıkıştırılıp gönderilir, yanıt tamponlanmaz.
+
+    BREACH: sır taşıyabilen yanıtlar (giriş yapılmış kullanıcı veya CSRF token'ı
+    içeren sayfa) gzip ile gönderilir; Django gzip başlığına rastgele uzunlukta dosya
+    adı ekleyerek sıkıştırılmış boyuttan sır çıkarılmasını zorlaştırır ("Heal the
+    Breach"), CSRF token'ı da her yanıtta farklı maskelenir. Brotli'de böyle bir dolgu
+    olmadığından yalnızca anonim ve formsuz sayfalarda kullanılır.
+    """
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if (
+            response.status_code == 206  # Range yanıtının bayt aralıkları sıkıştırmayla bozulur
+            or content_type == 'text/event-stream'  # SSE olayları tek tek, bekletilmeden gitmeli
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+        if (
+            brotli is not None
+            and re_accepts_brotli.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            and not _may_contain_secrets(request, response)
+        ):
+            return self._brotli_response(response)
+        return super().process_response(request, response)
+
+    def _brotli_response(self, response):
+        if not response.streaming and len(response.content) < 200:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if response.streaming:
+            if response.is_async:
+                original_iterator = response.streaming_content
+
+                async def brotli_wrapper():
+                    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+                    async for chunk in original_iterator:
+                        yield compressor.process(chunk) + compressor.flush()
+                    yield compressor.finish()
+
+                response.streaming_content = brotli_wrapper()
+            else:
+                response.streaming_content = _brotli_sequence(response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+def _may_contain_secrets(request, response):
+    # CSRF cookie'si, sayfada token kullanıldığında (get_token) yanıta eklenir
+    user = getattr(request, 'user', None)
+    return (user is not None and user.is_authenticated) or settings.CSRF_COOKIE_NAME in response.cookies
+
+
+def _brotli_sequence(sequence):
+    # Satır satır üreten akışlarda (CSV dışa aktarım) her parçada flush oranı düşürür;
+    # çıktı FLUSH_SIZE biriktikçe gönderilir
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    pending = 0
+    for chunk in sequence:
+        pending += len(chunk)
+        data = compressor.process(chunk)
+        if pending >= FLUSH_SIZE:
+            data += compressor.flush()
+            pending = 0
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class HTMLCacheControlMiddleware(MiddlewareMixin):
+    """
+    Cache-Control belirtmemiş HTML sayfalarını her seferinde doğrulanacak şekilde
+    işaretler; ConditionalGetMiddleware'in ETag'iyle değişmeyen sayfa 304 döner.
+    Giriş yapılmış kullanıcının sayfaları `private` olur, paylaşımlı önbelleklere
+    (proxy/CDN) girmez. Sayfa şablonu oturuma göre değiştiği için Vary: Cookie eklenir.
+    """
+
+    def process_response(self, request, response):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or response.has_header('Cache-Control')
+            or not response.get('Content-Type', '').startswith('text/html')
+        ):
+            return response
+        patch_vary_headers(response, ('Cookie',))
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
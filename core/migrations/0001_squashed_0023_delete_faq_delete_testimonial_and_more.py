@@ -0,0 +1,136 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:18
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ('core', '0001_initial'),
+        ('core', '0002_alter_investment_options_and_more'),
+        ('core', '0003_remove_package_amount_remove_package_description_and_more'),
+        ('core', '0004_cryptowallet_remove_investment_crypto_network_and_more'),
+        ('core', '0005_sitesetting'),
+        ('core', '0006_userinvestmentsummary'),
+        ('core', '0007_alter_paymentconfirmation_options_and_more'),
+        ('core', '0008_alter_paymentconfirmation_options_and_more'),
+        ('core', '0009_package_profit_percent_and_more'),
+        ('core', '0010_userinvestmentsummary_has_active_investment'),
+        ('core', '0011_alter_userinvestmentsummary_total_invested_and_more'),
+        ('core', '0012_remove_userinvestmentsummary_full_name_and_more'),
+        ('core', '0013_alter_userinvestmentsummary_total_invested_and_more'),
+        ('core', '0014_adminuser_regularuser'),
+        ('core', '0015_alter_adminuser_options'),
+        ('core', '0016_alter_adminuser_options'),
+        ('core', '0017_remove_investment_user_and_more'),
+        ('core', '0018_userinvestmentsummary_owner'),
+        ('core', '0019_remove_userinvestmentsummary_owner'),
+        ('core', '0020_alter_cryptowallet_active_alter_cryptowallet_address_and_more'),
+        ('core', '0021_delete_adminuser_delete_regularuser_profile_role'),
+        ('core', '0022_faq_testimonial_package_description'),
+        ('core', '0023_delete_faq_delete_testimonial_and_more'),
+    ]
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # Eklenip sonradan silinen AdminUser/RegularUser proxy'leri, FAQ/Testimonial ve özet
+    # sahibi alanları çıkarıldı; 0017'deki tek seferlik default'lar (preserve_default=False)
+    # şemaya taşınmadı. Eski kurulumlar 0001-0023'ü uygulamış olarak kalır.
+    operations = [
+        migrations.CreateModel(
+            name='Package',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('duration_days', models.PositiveIntegerField(verbose_name='Süre (gün)')),
+                ('profit_percent', models.PositiveIntegerField(default=100, verbose_name='Getiri Oranı (%)')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SiteSetting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('whatsapp_support_link', models.URLField(max_length=300, verbose_name='WhatsApp Destek Bağlantısı')),
+            ],
+            options={
+                'verbose_name': 'Site Ayarı',
+                'verbose_name_plural': 'Site Ayarları',
+            },
+        ),
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(blank=True, max_length=20, null=True)),
+                ('address', models.TextField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL)),
+                ('role', models.CharField(choices=[('user', 'Kullanıcı'), ('admin', 'Admin')], default='user', max_length=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CryptoWallet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('address', models.CharField(max_length=255)),
+                ('network', models.CharField(max_length=100)),
+                ('active', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Investment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('pending', 'Beklemede'), ('approved', 'Onaylandı'), ('cancelled', 'İptal Edildi'), ('refunded', 'İade Edildi')], default='pending', max_length=20)),
+                ('approved_at', models.DateTimeField(blank=True, null=True)),
+                ('cancelled_at', models.DateTimeField(blank=True, null=True)),
+                ('refunded_at', models.DateTimeField(blank=True, null=True)),
+                ('package', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.package')),
+                ('expected_return', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Beklenen Getiri')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='investments', to='core.profile')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'verbose_name': 'Yatırım',
+                'verbose_name_plural': 'Yatırımlar',
+            },
+        ),
+        migrations.CreateModel(
+            name='PaymentConfirmation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('whatsapp_number', models.CharField(max_length=20)),
+                ('payment_screenshot', models.ImageField(upload_to='payment_screenshots/')),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('admin_approved', models.BooleanField(default=False)),
+                ('admin_approved_at', models.DateTimeField(blank=True, null=True)),
+                ('investment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='payment_confirmation', to='core.investment')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserInvestmentSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_invested', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10)),
+                ('total_return', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10)),
+                ('pending_payments', models.PositiveIntegerField(default=0)),
+                ('has_active_investment', models.BooleanField(default=False)),
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='investment_summary', to='core.profile')),
+            ],
+            options={
+                'verbose_name': 'Yatırım Özeti',
+                'verbose_name_plural': 'Yatırım Özetleri',
+            },
+        ),
+    ]
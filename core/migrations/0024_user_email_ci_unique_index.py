@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_delete_faq_delete_testimonial_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # Boş email'ler NULL'a çevrilir; böylece email'siz (ör. createsuperuser) hesaplar
+    # çakışmaz, dolu email'ler büyük/küçük harf duyarsız olarak benzersiz olur.
+    # İfade core.models.USER_EMAIL_KEY ile birebir aynı kalmalı.
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX core_user_email_ci_uniq ON auth_user (LOWER(NULLIF(email, '')))",
+            reverse_sql="DROP INDEX core_user_email_ci_uniq",
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:35
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_user_email_ci_unique_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymentconfirmation',
+            name='payment_screenshot',
+            field=models.ImageField(storage=core.storage.receipt_storage, upload_to='payment_screenshots/'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_events(apps, schema_editor):
+    # Mevcut yatırımların geçmişi, saklanan zaman damgalarından yeniden kurulur
+    Investment = apps.get_model('core', 'Investment')
+    InvestmentEvent = apps.get_model('core', 'InvestmentEvent')
+    stamps = {'approved': 'approved_at', 'cancelled': 'cancelled_at', 'refunded': 'refunded_at'}
+
+    events = []
+    for investment in Investment.objects.order_by('pk').iterator(chunk_size=2000):
+        events.append(InvestmentEvent(
+            investment_id=investment.pk, from_status='', to_status='pending', created_at=investment.created_at,
+        ))
+        if investment.status != 'pending':
+            stamp = getattr(investment, stamps.get(investment.status, ''), None) or investment.created_at
+            events.append(InvestmentEvent(
+                investment_id=investment.pk, from_status='pending', to_status=investment.status, created_at=stamp,
+            ))
+        if len(events) >= 2000:
+            InvestmentEvent.objects.bulk_create(events)
+            events = []
+    InvestmentEvent.objects.bulk_create(events)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_payment_screenshot_content_addressed_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectionCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_event_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InvestmentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('pending', 'Beklemede'), ('approved', 'Onaylandı'), ('cancelled', 'İptal Edildi'), ('refunded', 'İade Edildi')], max_length=20)),
+                ('to_status', models.CharField(choices=[('pending', 'Beklemede'), ('approved', 'Onaylandı'), ('cancelled', 'İptal Edildi'), ('refunded', 'İade Edildi')], max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('investment', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='core.investment')),
+            ],
+            options={
+                'verbose_name': 'Yatırım Olayı',
+                'verbose_name_plural': 'Yatırım Olayları',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['investment', 'created_at'], name='core_invevent_inv_created_idx'), models.Index(fields=['created_at'], name='core_invevent_created_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
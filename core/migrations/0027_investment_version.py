@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_investment_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='investment',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='investment',
+            index=models.Index(fields=['-created_at'], name='core_investment_created_idx'),
+        ),
+    ]
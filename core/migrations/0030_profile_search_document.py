@@ -0,0 +1,76 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:52
+
+from django.db import migrations, models
+
+# SQLite: profil tablosunu içerik olarak kullanan FTS5 trigram tablosu; tetikleyiciler
+# senkron tutar. SQLite'ta core_profile'ı yeniden kuran (AlterField vb.) bir migration
+# tetikleyicileri de düşürür; migrate sonunda core.search.restore_search_triggers
+# eksikleri yeniden oluşturur.
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE core_profile_search USING fts5("
+    "search_document, content='core_profile', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER core_profile_search_ai AFTER INSERT ON core_profile BEGIN "
+    "INSERT INTO core_profile_search(rowid, search_document) VALUES (new.id, new.search_document); END",
+    "CREATE TRIGGER core_profile_search_ad AFTER DELETE ON core_profile BEGIN "
+    "INSERT INTO core_profile_search(core_profile_search, rowid, search_document) "
+    "VALUES ('delete', old.id, old.search_document); END",
+    "CREATE TRIGGER core_profile_search_au AFTER UPDATE OF search_document ON core_profile BEGIN "
+    "INSERT INTO core_profile_search(core_profile_search, rowid, search_document) "
+    "VALUES ('delete', old.id, old.search_document); "
+    "INSERT INTO core_profile_search(rowid, search_document) VALUES (new.id, new.search_document); END",
+    "INSERT INTO core_profile_search(core_profile_search) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS core_profile_search_ai",
+    "DROP TRIGGER IF EXISTS core_profile_search_ad",
+    "DROP TRIGGER IF EXISTS core_profile_search_au",
+    "DROP TABLE IF EXISTS core_profile_search",
+]
+POSTGRESQL_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX core_profile_search_trgm ON core_profile USING gin (search_document gin_trgm_ops)",
+]
+POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS core_profile_search_trgm",
+]
+
+
+def backfill_search_document(apps, schema_editor):
+    Profile = apps.get_model('core', 'Profile')
+    batch = []
+    for profile in Profile.objects.select_related('user').order_by('pk').iterator(chunk_size=2000):
+        user = profile.user
+        parts = [user.username, user.email, user.first_name, user.last_name, profile.phone_number]
+        profile.search_document = ' '.join(part for part in parts if part).lower()
+        batch.append(profile)
+        if len(batch) >= 2000:
+            Profile.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    Profile.objects.bulk_update(batch, ['search_document'])
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_investment_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_CREATE, 'postgresql': POSTGRESQL_CREATE}),
+            _run({'sqlite': SQLITE_DROP, 'postgresql': POSTGRESQL_DROP}),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_paymentconfirmation_review_claim'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='possible_duplicate',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.paymentconfirmation', verbose_name='Olası mükerrer'),
+        ),
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='screenshot_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='screenshot_hash_0',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='screenshot_hash_1',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='screenshot_hash_2',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='screenshot_hash_3',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='paymentconfirmation',
+            index=models.Index(fields=['screenshot_hash_0'], name='core_payconf_hash0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentconfirmation',
+            index=models.Index(fields=['screenshot_hash_1'], name='core_payconf_hash1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentconfirmation',
+            index=models.Index(fields=['screenshot_hash_2'], name='core_payconf_hash2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentconfirmation',
+            index=models.Index(fields=['screenshot_hash_3'], name='core_payconf_hash3_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_sent_at(apps, schema_editor):
+    PaymentConfirmation = apps.get_model('core', 'PaymentConfirmation')
+    PaymentConfirmation.objects.update(updated_at=models.F('sent_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_paymentconfirmation_screenshot_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_sent_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='paymentconfirmation',
+            index=models.Index(fields=['updated_at', 'id'], name='core_payconf_updated_idx'),
+        ),
+    ]
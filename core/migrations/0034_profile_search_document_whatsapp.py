@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:05
+
+from django.db import migrations
+
+
+def backfill_search_document(apps, schema_editor):
+    # Dekontlardaki WhatsApp numaraları artık profilin arama metnine dahil
+    Profile = apps.get_model('core', 'Profile')
+    PaymentConfirmation = apps.get_model('core', 'PaymentConfirmation')
+    numbers = {}
+    for profile_id, number in PaymentConfirmation.objects.values_list(
+        'investment__profile_id', 'whatsapp_number',
+    ).order_by('whatsapp_number').distinct().iterator(chunk_size=2000):
+        numbers.setdefault(profile_id, []).append(number)
+    batch = []
+    for profile in Profile.objects.select_related('user').order_by('pk').iterator(chunk_size=2000):
+        user = profile.user
+        parts = [user.username, user.email, user.first_name, user.last_name, profile.phone_number]
+        parts += numbers.get(profile.pk, [])
+        profile.search_document = ' '.join(part for part in parts if part).lower()
+        batch.append(profile)
+        if len(batch) >= 2000:
+            Profile.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    Profile.objects.bulk_update(batch, ['search_document'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_paymentconfirmation_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+    ]
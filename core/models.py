@@ -1,10 +1,25 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import Count, F, Func, Q, Sum
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from django.utils import timezone
 from decimal import Decimal
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from . import phash
+from .backends import forget_users
+from .returns import expected_return
+from .storage import receipt_storage, recently_written
+
+
+# auth_user üzerindeki core_user_email_ci_uniq indeksinin ifadesi (migration 0024).
+# '' parametre yerine sabit olarak yazılır; aksi halde SQLite indeksi eşleştiremez.
+USER_EMAIL_KEY = Lower(Func(F('email'), template="NULLIF(%(expressions)s, '')"))
+
 
 class Profile(models.Model):
     ROLE_CHOICES = (
@@ -15,10 +30,28 @@ class Profile(models.Model):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
+    # Admin aramasının kullandığı küçük harfli, denormalize metin (core.search)
+    search_document = models.TextField(blank=True, default='', editable=False)
 
     def __str__(self):
         return f"{self.user.username} ({self.get_role_display()})"
 
+    def build_search_document(self):
+        user = self.user
+        parts = [user.username, user.email, user.first_name, user.last_name, self.phone_number]
+        if self.pk:
+            # Dekont bildirimlerindeki WhatsApp numaraları da aranabilir olsun
+            parts += PaymentConfirmation.objects.filter(investment__profile=self).values_list(
+                'whatsapp_number', flat=True,
+            ).order_by('whatsapp_number').distinct()
+        return ' '.join(part for part in parts if part).lower()
+
+    def save(self, *args, **kwargs):
+        self.search_document = self.build_search_document()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'search_document'}
+        super().save(*args, **kwargs)
+
 
 @receiver(post_save, sender=User)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
@@ -33,6 +66,16 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
             Profile.objects.create(user=instance, role='user')
 
 
+@receiver([post_save, post_delete], sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_users([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def forget_cached_profile_user(sender, instance, **kwargs):
+    forget_users([instance.user_id])
+
+
 # Site ayarları
 class SiteSetting(models.Model):
     whatsapp_support_link = models.URLField(verbose_name="WhatsApp Destek Bağlantısı", max_length=300)
@@ -69,6 +112,46 @@ class Package(models.Model):
 
 
 
+class ConcurrentUpdateError(Exception):
+    """Kayıt, okunduğu andan bu yana başka bir işlem tarafından değiştirildi."""
+
+
+def status_timestamps(status, now):
+    # Yeni durumun tarih alanı damgalanır, diğerleri temizlenir
+    stamps = dict.fromkeys(Investment.TIMESTAMP_FIELDS.values())
+    if status in Investment.TIMESTAMP_FIELDS:
+        stamps[Investment.TIMESTAMP_FIELDS[status]] = now
+    return stamps
+
+
+class InvestmentQuerySet(models.QuerySet):
+    def transition(self, status, actor=None):
+        """
+        Seçili yatırımları `status` durumuna geçirir. Her satır, okunduğu durum ve
+        sürümdeyse güncellenir (satır kilidi alınmaz); arada başkası değiştirdiyse
+        atlanır. Olaylar tek INSERT ile yazılır. (geçen, çakışan) sayılarını döner.
+        """
+        now = timezone.now()
+        stamps = status_timestamps(status, now)
+        events, profile_ids, conflicts = [], set(), 0
+        with transaction.atomic():
+            rows = self.exclude(status=status).order_by().values_list('pk', 'status', 'version', 'profile_id')
+            for pk, previous, version, profile_id in rows:
+                updated = Investment.objects.filter(pk=pk, status=previous, version=version).update(
+                    status=status, version=F('version') + 1, **stamps,
+                )
+                if not updated:
+                    conflicts += 1
+                    continue
+                events.append(InvestmentEvent(
+                    investment_id=pk, from_status=previous, to_status=status, actor=actor, created_at=now,
+                ))
+                profile_ids.add(profile_id)
+            InvestmentEvent.objects.bulk_create(events)
+            UserInvestmentSummary.objects.rebuild(profile_ids)
+        return len(events), conflicts
+
+
 # Yatırımlar
 class Investment(models.Model):
     STATUS_PENDING = 'pending'
@@ -83,6 +166,13 @@ class Investment(models.Model):
         (STATUS_REFUNDED, 'İade Edildi'),
     ]
 
+    # Her durumun damgaladığı tarih alanı; geçişte diğerleri temizlenir
+    TIMESTAMP_FIELDS = {
+        STATUS_APPROVED: 'approved_at',
+        STATUS_CANCELLED: 'cancelled_at',
+        STATUS_REFUNDED: 'refunded_at',
+    }
+
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='investments')
     package = models.ForeignKey(Package, on_delete=models.PROTECT)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -92,15 +182,28 @@ class Investment(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     cancelled_at = models.DateTimeField(null=True, blank=True)
     refunded_at = models.DateTimeField(null=True, blank=True)
+    # İyimser kilit: her yazmada artar, güncellemeler okunan sürüme koşullu yapılır
+    version = models.PositiveIntegerField(default=0)
+
+    objects = InvestmentQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        # Varsayılan sıralama; admin listeleri ve autocomplete sayfalaması bu indeksi kullanır
+        indexes = [models.Index(fields=['-created_at'], name='core_investment_created_idx')]
         verbose_name = 'Yatırım'
         verbose_name_plural = 'Yatırımlar'
 
-    def save(self, *args, **kwargs):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Durum geçişini olay tablosuna yazabilmek için yüklenen durum saklanır
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, actor=None, **kwargs):
         if not self.expected_return and self.amount and self.package:
-            self.expected_return = self.amount * (Decimal(1) + Decimal(self.package.profit_percent) / Decimal(100))
+            self.expected_return = expected_return(self.amount, self.package.profit_percent)
 
         now = timezone.now()
         if self.status == self.STATUS_APPROVED and not self.approved_at:
@@ -120,12 +223,153 @@ class Investment(models.Model):
             self.cancelled_at = None
             self.refunded_at = None
 
-        super().save(*args, **kwargs)
+        previous = '' if self._state.adding else getattr(self, '_loaded_status', None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if previous is not None and previous != self.status:
+                InvestmentEvent.objects.create(
+                    investment=self, from_status=previous, to_status=self.status, actor=actor,
+                )
+        self._loaded_status = self.status
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # UPDATE ... WHERE id = %s AND version = <okunan sürüm>; version bir artırılır
+        version_field = self._meta.get_field('version')
+        values = [item for item in values if item[0] is not version_field]
+        values.append((version_field, None, self.version + 1))
+        updated = super()._do_update(
+            base_qs.filter(version=self.version), using, pk_val, values, update_fields, forced_update,
+        )
+        if not updated:
+            if base_qs.filter(pk=pk_val).exists():
+                raise ConcurrentUpdateError("Bu yatırım başka bir işlem tarafından değiştirildi.")
+            return False
+        self.version += 1
+        return True
+
+    def transition(self, status, actor=None):
+        """
+        Durumu karşılaştır-ve-değiştir (status + version) ile günceller. Kayıt okunduktan
+        sonra başkası değiştirdiyse ConcurrentUpdateError fırlatır; satır kilitlenmez.
+        """
+        if status == self.status:
+            return
+        now = timezone.now()
+        stamps = status_timestamps(status, now)
+        with transaction.atomic():
+            updated = Investment.objects.filter(pk=self.pk, status=self.status, version=self.version).update(
+                status=status, version=F('version') + 1, **stamps,
+            )
+            if not updated:
+                raise ConcurrentUpdateError("Bu yatırımın durumu başka bir işlem tarafından değiştirildi.")
+            InvestmentEvent.objects.create(
+                investment=self, from_status=self.status, to_status=status, actor=actor, created_at=now,
+            )
+            UserInvestmentSummary.objects.rebuild([self.profile_id])
+
+        for name, value in stamps.items():
+            setattr(self, name, value)
+        self.status = self._loaded_status = status
+        self.version += 1
 
     def __str__(self):
         return f"{self.profile.user.username} - {self.package.name} | {self.amount}₺ | {self.status} | {self.created_at.strftime('%d/%m/%Y')}"
 
 
+class UserInvestmentSummaryManager(models.Manager):
+    def rebuild(self, profile_ids, batch_size=500):
+        """
+        Verilen profillerin özetlerini gruplanmış sorgularla tek geçişte yeniden
+        hesaplar (profil başına sorgu atmadan). Toplu içe aktarma sonrası kullanılır.
+        """
+        profile_ids = sorted(set(profile_ids))
+        fields = ['total_invested', 'total_return', 'pending_payments', 'has_active_investment']
+        for start in range(0, len(profile_ids), batch_size):
+            ids = profile_ids[start:start + batch_size]
+            totals = {
+                row['profile_id']: row
+                for row in Investment.objects.filter(profile_id__in=ids, status=Investment.STATUS_APPROVED)
+                .order_by().values('profile_id')
+                .annotate(total_invested=Sum('amount'), total_return=Sum('expected_return'))
+            }
+            pending = dict(
+                PaymentConfirmation.objects.filter(investment__profile_id__in=ids, admin_approved=False)
+                .order_by().values('investment__profile_id')
+                .annotate(count=Count('id'))
+                .values_list('investment__profile_id', 'count')
+            )
+            existing = {summary.profile_id: summary for summary in self.filter(profile_id__in=ids)}
+
+            to_create, to_update = [], []
+            for profile_id in ids:
+                row = totals.get(profile_id, {})
+                summary = existing.get(profile_id) or self.model(profile_id=profile_id)
+                summary.total_invested = row.get('total_invested') or Decimal('0')
+                summary.total_return = row.get('total_return') or Decimal('0')
+                summary.pending_payments = pending.get(profile_id, 0)
+                summary.has_active_investment = profile_id in totals
+                (to_update if summary.pk else to_create).append(summary)
+            self.bulk_create(to_create)
+            self.bulk_update(to_update, fields)
+            # Toplu yazımlar post_save tetiklemez; önbellekteki kullanıcılar burada silinir
+            forget_users(Profile.objects.filter(pk__in=ids).values_list('user_id', flat=True))
+
+
+# Yatırım formundaki gizli anahtar: aynı form ikinci kez gönderilirse (çift tıklama,
+# yeniden deneme) yeni yatırım yerine ilk gönderimin yatırımı döner
+# Anahtarlar `manage.py purge_idempotency_keys` ile (varsayılan 24 saat sonra) silinir
+class IdempotencyKey(models.Model):
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='+', db_index=False)
+    key = models.CharField(max_length=64)
+    investment = models.ForeignKey(Investment, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'key'], name='core_idempotencykey_profile_key_uniq'),
+        ]
+
+
+# Yatırım durum geçişleri. Yalnızca ekleme yapılır; kayıtlar güncellenmez ve silinmez.
+class InvestmentEvent(models.Model):
+    # (investment, created_at) indeksi FK sorgularını da karşıladığı için ayrı FK indeksi yok
+    investment = models.ForeignKey(Investment, on_delete=models.CASCADE, related_name='events', db_index=False)
+    from_status = models.CharField(max_length=20, choices=Investment.STATUS_CHOICES, blank=True)
+    to_status = models.CharField(max_length=20, choices=Investment.STATUS_CHOICES)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['investment', 'created_at'], name='core_invevent_inv_created_idx'),
+            models.Index(fields=['created_at'], name='core_invevent_created_idx'),
+        ]
+        verbose_name = 'Yatırım Olayı'
+        verbose_name_plural = 'Yatırım Olayları'
+
+    def __str__(self):
+        return f"#{self.investment_id}: {self.from_status or '-'} → {self.to_status}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Yatırım olayları değiştirilemez.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Yatırım olayları silinemez.")
+
+
+# Olay tablosundan beslenen projeksiyonların en son işlediği olay
+class ProjectionCheckpoint(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    last_event_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_event_id}"
+
+
 # Yatırım Özeti
 class UserInvestmentSummary(models.Model):
     profile = models.OneToOneField(Profile, on_delete=models.CASCADE, related_name='investment_summary')
@@ -134,6 +378,8 @@ class UserInvestmentSummary(models.Model):
     pending_payments = models.PositiveIntegerField(default=0)
     has_active_investment = models.BooleanField(default=False)
 
+    objects = UserInvestmentSummaryManager()
+
     def __str__(self):
         return f"Yatırım Özeti - {self.profile.user.username}"
 
@@ -142,14 +388,163 @@ class UserInvestmentSummary(models.Model):
         verbose_name_plural = "Yatırım Özetleri"
 
 
+@receiver([post_save, post_delete], sender=UserInvestmentSummary)
+def forget_cached_summary_user(sender, instance, **kwargs):
+    forget_users(Profile.objects.filter(pk=instance.profile_id).values_list('user_id', flat=True))
+
+
+class PaymentConfirmationQuerySet(models.QuerySet):
+    def review_queue(self):
+        # İncelenmeyi bekleyen dekontlar: onaylanmamış ve yatırımı hâlâ beklemede
+        return self.filter(admin_approved=False, investment__status=Investment.STATUS_PENDING)
+
+    def claim(self, reviewer, limit, lease):
+        """
+        İnceleyicinin süresi dolmamış sahiplenmelerini tutar, kalan yeri kuyruğun en
+        eskilerinden doldurur ve hepsinin süresini uzatır. Başka bir işlemin o anda
+        kilitlediği satırlar beklenmeden atlanır (SKIP LOCKED); kilit desteği olmayan
+        veritabanlarında da UPDATE koşulu aynı satırın iki kişiye verilmesini önler.
+        """
+        now = timezone.now()
+        expires = now + lease
+        queue = self.review_queue().order_by('sent_at', 'pk')
+        with transaction.atomic():
+            held = list(
+                queue.filter(claimed_by=reviewer, claim_expires_at__gt=now)
+                .select_for_update(of=('self',)).values_list('pk', flat=True)[:limit]
+            )
+            free = Q(claimed_by__isnull=True) | Q(claim_expires_at__lte=now)
+            if len(held) < limit:
+                held += queue.filter(free).select_for_update(skip_locked=True, of=('self',)).values_list(
+                    'pk', flat=True,
+                )[:limit - len(held)]
+            PaymentConfirmation.objects.filter(
+                free | Q(claimed_by=reviewer), pk__in=held,
+            ).update(claimed_by=reviewer, claim_expires_at=expires)
+        return self.filter(claimed_by=reviewer, claim_expires_at=expires)
+
+    def release(self, reviewer):
+        return self.filter(claimed_by=reviewer).update(claimed_by=None, claim_expires_at=None)
+
+
 # Ödeme Onayı
 class PaymentConfirmation(models.Model):
+    REVIEW_BATCH_SIZE = 10
+    REVIEW_LEASE = timedelta(minutes=10)
+    SCREENSHOT_HASH_FIELDS = ['screenshot_hash', *phash.HASH_FIELDS, 'possible_duplicate']
+
     investment = models.OneToOneField(Investment, on_delete=models.CASCADE, related_name='payment_confirmation')
     whatsapp_number = models.CharField(max_length=20)
-    payment_screenshot = models.ImageField(upload_to='payment_screenshots/')
+    payment_screenshot = models.ImageField(upload_to='payment_screenshots/', storage=receipt_storage)
     sent_at = models.DateTimeField(auto_now_add=True)
+    # Canlı akışın (core.feeds) takip ettiği son değişiklik zamanı
+    updated_at = models.DateTimeField(auto_now=True)
     admin_approved = models.BooleanField(default=False)
     admin_approved_at = models.DateTimeField(null=True, blank=True)
+    # İnceleme kuyruğu: dekontu o an inceleyen yönetici ve sahiplenmenin bitişi
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', editable=False)
+    claim_expires_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Dekont görselinin algısal özeti (core.phash) ve aramada kullanılan 16 bitlik parçaları
+    screenshot_hash = models.CharField(max_length=16, blank=True, default='', editable=False)
+    screenshot_hash_0 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    screenshot_hash_1 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    screenshot_hash_2 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    screenshot_hash_3 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    # Aynı veya çok benzer görselle daha önce gönderilmiş dekont
+    possible_duplicate = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='+', editable=False,
+        verbose_name="Olası mükerrer",
+    )
+
+    objects = PaymentConfirmationQuerySet.as_manager()
+
+    class Meta:
+        # Kuyruk yalnızca onaylanmamış satırları tarar; kısmi indeks onaylananlarla büyümez
+        indexes = [
+            models.Index(fields=['sent_at'], condition=Q(admin_approved=False), name='core_payconf_queue_idx'),
+            models.Index(fields=['screenshot_hash_0'], name='core_payconf_hash0_idx'),
+            models.Index(fields=['screenshot_hash_1'], name='core_payconf_hash1_idx'),
+            models.Index(fields=['screenshot_hash_2'], name='core_payconf_hash2_idx'),
+            models.Index(fields=['screenshot_hash_3'], name='core_payconf_hash3_idx'),
+            models.Index(fields=['updated_at', 'id'], name='core_payconf_updated_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Yeni yüklenen görselin özeti dosya depolamaya yazılmadan, bellekteyken hesaplanır
+        if self.payment_screenshot and not self.payment_screenshot._committed:
+            self.update_screenshot_hash(PaymentConfirmation.objects.exclude(pk=self.pk))
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], *self.SCREENSHOT_HASH_FIELDS}
+        super().save(*args, **kwargs)
+
+    def update_screenshot_hash(self, others):
+        """Görselin özetini hesaplar ve `others` içinde benzer bir dekont arar (kaydetmez)."""
+        file = self.payment_screenshot
+        file.open('rb')
+        try:
+            value = phash.dhash(file)
+        finally:
+            file.seek(0)
+        if value is None:
+            self.screenshot_hash = ''
+            for name in phash.HASH_FIELDS:
+                setattr(self, name, None)
+            self.possible_duplicate_id = None
+            return
+        self.screenshot_hash = phash.to_hex(value)
+        for name, chunk in zip(phash.HASH_FIELDS, phash.split(value)):
+            setattr(self, name, chunk)
+        self.possible_duplicate_id = phash.find_duplicate(value, others)
+
+    def is_claimed_by_other(self, user, now=None):
+        now = now or timezone.now()
+        return (
+            self.claimed_by_id is not None and self.claimed_by_id != user.pk
+            and self.claim_expires_at is not None and self.claim_expires_at > now
+        )
+
+    def set_approved(self, approved):
+        """admin_approved üzerinde karşılaştır-ve-değiştir; aynı onay iki kez damgalanmaz."""
+        now = timezone.now()
+        approved_at = now if approved else None
+        # Karar verilen dekont kuyruktan çıkar; sahiplenme de bırakılır
+        updated = PaymentConfirmation.objects.filter(pk=self.pk, admin_approved=not approved).update(
+            admin_approved=approved, admin_approved_at=approved_at, claimed_by=None, claim_expires_at=None,
+            updated_at=now,
+        )
+        if not updated:
+            raise ConcurrentUpdateError("Bu ödeme onayı başka bir işlem tarafından değiştirildi.")
+        self.admin_approved, self.admin_approved_at, self.updated_at = approved, approved_at, now
+        self.claimed_by, self.claim_expires_at = None, None
 
     def __str__(self):
         return f"{self.investment.profile.user.username} - Ödeme Onayı ({self.sent_at.strftime('%d/%m/%Y')})"
+
+
+@receiver([post_save, post_delete], sender=PaymentConfirmation)
+def update_profile_search_document(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'whatsapp_number' not in update_fields:
+        return
+    profile = Profile.objects.select_related('user').filter(investments__id=instance.investment_id).first()
+    if profile is not None:
+        profile.save(update_fields=['search_document'])
+
+
+@receiver(post_delete, sender=PaymentConfirmation)
+def delete_payment_screenshot_file(sender, instance, **kwargs):
+    # İçerik adresli depolamada aynı dosyayı başka kayıtlar da kullanıyor olabilir
+    name = instance.payment_screenshot.name
+    if not name:
+        return
+    storage = instance.payment_screenshot.storage
+
+    def delete_if_unreferenced():
+        with transaction.atomic():
+            if PaymentConfirmation.objects.filter(payment_screenshot=name).exists():
+                return
+            # Aynı içerik şu anda yeniden yükleniyor olabilir; gc_media daha sonra toplar
+            if recently_written(storage, name):
+                return
+            storage.delete(name)
+
+    transaction.on_commit(delete_if_unreferenced)
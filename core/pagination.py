@@ -0,0 +1,38 @@
+import re
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+PLANNER_ROWS_RE = re.compile(r'rows=(\d+)')
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    PostgreSQL'de büyük sonuç kümeleri için COUNT(*) yerine sorgu planlayıcısının
+    tahminini kullanır (EXPLAIN). Tahmin eşiğin altındaysa gerçek sayım yapılır;
+    diğer veritabanlarında her zaman gerçek sayım kullanılır.
+    """
+
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self._planner_estimate()
+        if estimate is not None and estimate > self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def _planner_estimate(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN {sql}', params)
+            match = PLANNER_ROWS_RE.search(cursor.fetchone()[0])
+        return int(match.group(1)) if match else None
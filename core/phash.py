@@ -0,0 +1,73 @@
+"""
+Dekont görselleri için algısal özet (dHash) ve çoklu indeksli Hamming araması.
+
+64 bitlik özet 4 adet 16 bitlik parçaya bölünüp ayrı indeksli sütunlarda saklanır.
+İki özet arasındaki Hamming uzaklığı d ise, güvercin yuvası ilkesiyle en az bir
+parçadaki uzaklık d // 4 veya daha azdır. Her parça için kendisi ve 1 bit farklı
+16 komşusu aranınca (4 x 17 indeks araması) uzaklığı 7'ye kadar olan bütün
+özetler aday olarak gelir; tüm tablo taranmaz. Adayların gerçek uzaklığı
+Python'da hesaplanır.
+"""
+from django.db.models import Q
+
+CHUNKS = 4
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+# Aynı ya da hafifçe kırpılmış/sıkıştırılmış görseller bu uzaklığın altında kalır
+DUPLICATE_DISTANCE = 6
+HASH_FIELDS = [f'screenshot_hash_{i}' for i in range(CHUNKS)]
+
+
+def dhash(fileobj):
+    """
+    Görseli 9x8 gri tonlamaya küçültüp yan yana piksellerin parlaklık farkından
+    64 bitlik bir tamsayı üretir. Açılamayan ve piksel sınırını (MAX_IMAGE_PIXELS)
+    aşan dosyalar için None döner.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        image = Image.open(fileobj)
+        image.draft('L', (64, 64))  # JPEG'lerde tam çözünürlükte açmadan küçültür
+        pixels = list(image.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return None
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def split(value):
+    return [(value >> (CHUNK_BITS * i)) & CHUNK_MASK for i in range(CHUNKS)]
+
+
+def to_hex(value):
+    return f'{value:016x}'
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def _neighbours(chunk):
+    return [chunk, *(chunk ^ (1 << bit) for bit in range(CHUNK_BITS))]
+
+
+def find_duplicate(value, queryset):
+    """
+    queryset içinde `value` özetine DUPLICATE_DISTANCE veya daha yakın olan kaydın
+    ID'sini (en yakın, eşitlikte en eski) döner; yoksa None.
+    """
+    condition = Q()
+    for field, chunk in zip(HASH_FIELDS, split(value)):
+        condition |= Q(**{f'{field}__in': _neighbours(chunk)})
+    candidates = queryset.filter(condition).exclude(screenshot_hash='').values_list('pk', 'screenshot_hash')
+
+    best = None
+    for pk, other in candidates:
+        distance = hamming(value, int(other, 16))
+        if distance <= DUPLICATE_DISTANCE and (best is None or (distance, pk) < best):
+            best = (distance, pk)
+    return best and best[1]
@@ -0,0 +1,117 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'5/m' -> (5, 60)"""
+    count, _, period = rate.partition('/')
+    return int(count), RATE_PERIODS[period[:1].lower()]
+
+
+def client_ip(request):
+    meta_key = getattr(settings, 'RATELIMIT_IP_META_KEY', 'REMOTE_ADDR')
+    addresses = [address.strip() for address in request.META.get(meta_key, '').split(',') if address.strip()]
+    if not addresses:
+        return 'unknown'
+    # X-Forwarded-For "client, proxy1, proxy2" şeklinde gelir ama soldaki adresleri istemci
+    # kendisi yazabilir. Güvenilen her proxy gördüğü adresi sona ekler; sondan
+    # RATELIMIT_TRUSTED_PROXIES'inci adres, ilk güvenilen proxy'nin gördüğü istemcidir.
+    trusted = max(getattr(settings, 'RATELIMIT_TRUSTED_PROXIES', 1), 1)
+    return addresses[-min(trusted, len(addresses))]
+
+
+def user_or_ip(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{client_ip(request)}'
+
+
+KEY_FUNCTIONS = {
+    'ip': lambda request: f'ip:{client_ip(request)}',
+    'user_or_ip': user_or_ip,
+}
+
+
+def hit(bucket, rate):
+    """
+    Kayan pencere sayacı: geçerli ve bir önceki sabit pencerenin sayaçları tutulur,
+    önceki pencere kalan süresi oranında sayılır. Sayaç cache.add() + cache.incr() ile
+    atomik artırılır (Redis/Memcached'de tek komut); limit aşılırsa artış geri alınır.
+    Eşzamanlı istekler aynı değeri okuyup ikisi birden geçemez.
+
+    İzin verilirse 0, aksi halde tekrar denemeden önce beklenecek saniyeyi döner.
+    """
+    limit, period = parse_rate(rate)
+    cache = caches[getattr(settings, 'RATELIMIT_CACHE', 'default')]
+    now = time.time()
+    window, elapsed = divmod(now, period)
+    key = f'rl:{bucket}:{int(window)}'
+
+    # Anahtar bir sonraki pencere boyunca da (önceki pencere olarak) okunur
+    cache.add(key, 0, period * 2)
+    try:
+        current = cache.incr(key)
+    except ValueError:
+        # add ile incr arasında silindi (cache temizlendi/dolu); bu istek sayılmaz
+        return 0
+    previous = cache.get(f'rl:{bucket}:{int(window) - 1}', 0)
+    weight = 1 - elapsed / period
+    if previous * weight + current <= limit:
+        return 0
+
+    cache.decr(key)
+    if current > limit:
+        return period - elapsed
+    # Önceki pencerenin payı, toplam limitin altına inene kadar azalır
+    return max(period * (1 - (limit - current) / previous) - elapsed, 1)
+
+
+def check_shared_cache(workers):
+    """
+    Sayaçlar süreç içi bir cache'teyse her worker kendi sayacını tutar; birden çok
+    worker ile etkin limit worker sayısıyla çarpılacağından başlatma reddedilir.
+    """
+    if workers <= 1 or not getattr(settings, 'RATELIMIT_ENABLED', True):
+        return
+    backend = settings.CACHES[getattr(settings, 'RATELIMIT_CACHE', 'default')]['BACKEND']
+    if backend in settings.PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"Rate limit {workers} worker ile paylaşımlı bir cache gerektirir: REDIS_URL verin "
+            "(ya da WEB_CONCURRENCY=1 veya RATELIMIT_ENABLED=0)."
+        )
+
+
+def ratelimit(rate, key='ip', methods=('POST',)):
+    """
+    View dekoratörü; limit aşılınca 429 ve Retry-After başlığı döner.
+
+        @ratelimit('5/m', key='ip')
+        def register(request): ...
+    """
+    key_func = KEY_FUNCTIONS[key] if isinstance(key, str) else key
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if getattr(settings, 'RATELIMIT_ENABLED', True) and request.method in methods:
+                bucket = f'{view_func.__module__}.{view_func.__name__}:{key_func(request)}'
+                retry_after = hit(bucket, rate)
+                if retry_after:
+                    response = HttpResponse(
+                        'Çok fazla istek gönderdiniz. Lütfen biraz bekleyip tekrar deneyin.',
+                        status=429,
+                        content_type='text/plain; charset=utf-8',
+                    )
+                    response['Retry-After'] = str(math.ceil(retry_after))
+                    return response
+            return view_func(request, *args, **kwargs)
+        return _wrapped
+    return decorator
@@ -0,0 +1,169 @@
+"""
+Getiri hesaplarının tek kaynağı. Aynı formül iki biçimde bulunur:
+
+- Decimal fonksiyonlar: tek kayıt veya values() satırları üzerinde toplu hesap.
+- SQL ifadeleri: annotate()/update() ile tüm bir queryset için tek sorguda hesap.
+
+Her ikisi de kuruşa (2 hane) "half up" yuvarlar, böylece Python'da ve veritabanında
+hesaplanan değerler birebir aynı olur.
+"""
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import DateTimeField, DecimalField, F, Func, OuterRef, Subquery, Value
+from django.utils import timezone
+
+HUNDRED = Decimal(100)
+CENT = Decimal('0.01')
+MONEY = DecimalField(max_digits=10, decimal_places=2)
+
+
+def quantize(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def expected_return(amount, profit_percent):
+    """Vade sonunda ödenecek toplam tutar (anapara + getiri)."""
+    return quantize(Decimal(amount) * (HUNDRED + Decimal(profit_percent or 0)) / HUNDRED)
+
+
+def maturity_date(approved_at, duration_days):
+    if approved_at is None:
+        return None
+    return approved_at + timedelta(days=duration_days)
+
+
+def accrued_return(amount, expected, approved_at, duration_days, at=None):
+    """Onaydan bu yana doğrusal olarak işlemiş getiri; vadede toplam getiriye ulaşır."""
+    if approved_at is None or expected is None:
+        return Decimal('0.00')
+    at = at or timezone.now()
+    term = timedelta(days=duration_days)
+    elapsed = min(max(at - approved_at, timedelta(0)), term)
+    if not term:
+        return quantize(expected - amount)
+    return quantize((expected - amount) * Decimal(elapsed // timedelta(microseconds=1)) / Decimal(term // timedelta(microseconds=1)))
+
+
+def schedule(rows, at=None):
+    """
+    values('id', 'amount', 'expected_return', 'approved_at', 'package__duration_days')
+    satırları için {id: (vade tarihi, işlemiş getiri)} döner.
+    """
+    at = at or timezone.now()
+    return {
+        row['id']: (
+            maturity_date(row['approved_at'], row['package__duration_days']),
+            accrued_return(row['amount'], row['expected_return'], row['approved_at'], row['package__duration_days'], at),
+        )
+        for row in rows
+    }
+
+
+class ExpectedReturn(Func):
+    """
+    tutar * (100 + oran) / 100, kuruşa half up. PostgreSQL/MySQL'de numeric aritmetik
+    kesindir. SQLite'ta küsuratsız tutarlar INTEGER saklandığından bölme tam sayı bölmesi
+    olur, REAL'e çevirmek de .xx5 sınırlarında kayar; hesap tam sayı kuruşlarla yapılır.
+    """
+    arity = 2
+    output_field = MONEY
+
+    def _compile(self, compiler):
+        amount, percent = self.get_source_expressions()
+        amount_sql, amount_params = compiler.compile(amount)
+        percent_sql, percent_params = compiler.compile(percent)
+        return amount_sql, percent_sql, (*amount_params, *percent_params)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        amount, percent, params = self._compile(compiler)
+        return f'ROUND({amount} * (100 + {percent}) / 100, 2)', params
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Pozitif sayıda +50 ve tam sayıya kesme, kuruşu half up yuvarlar
+        amount, percent, params = self._compile(compiler)
+        return f'(CAST((ROUND({amount} * 100) * (100 + {percent}) + 50) / 100 AS INTEGER) / 100.0)', params
+
+
+def expected_return_expression(amount='amount', profit_percent='package__profit_percent'):
+    """expected_return() ile aynı formülün SQL karşılığı."""
+    if isinstance(profit_percent, str):
+        profit_percent = F(profit_percent)
+    return ExpectedReturn(F(amount), profit_percent)
+
+
+class AddDays(Func):
+    """
+    tarih + gün sayısı (sütun). Django'nun süre aritmetiği SQLite'ta tamsayı * süre
+    çarpımını desteklemediği için her veritabanına ayrı SQL üretilir.
+    """
+    arity = 2
+    output_field = DateTimeField()
+
+    def _compile(self, compiler):
+        date, days = self.get_source_expressions()
+        date_sql, date_params = compiler.compile(date)
+        days_sql, days_params = compiler.compile(days)
+        return date_sql, days_sql, (*date_params, *days_params)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        date, days, params = self._compile(compiler)
+        return f'({date} + make_interval(days => {days}))', params
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Milisaniye hassasiyetinde; SQLite'ın datetime() fonksiyonu saniyeye yuvarlar
+        date, days, params = self._compile(compiler)
+        return f"STRFTIME('%%Y-%%m-%%d %%H:%%M:%%f', {date}, '+' || {days} || ' days')", params
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        date, days, params = self._compile(compiler)
+        return f'DATE_ADD({date}, INTERVAL {days} DAY)', params
+
+
+def maturity_expression(approved_at='approved_at', duration_days='package__duration_days'):
+    """maturity_date() ile aynı hesabın SQL karşılığı; onaylanmamışsa NULL."""
+    return AddDays(F(approved_at), F(duration_days))
+
+
+def with_returns(queryset):
+    """Yatırım queryset'ine `matures_at` (vade tarihi) ekler (tek sorgu)."""
+    return queryset.annotate(matures_at=maturity_expression())
+
+
+def recalculate_expected_returns(queryset, profit_percent=None):
+    """
+    expected_return'ü tek UPDATE'te yeniden hesaplar. Oran verilmezse her satırın
+    paketinden alt sorguyla okunur (UPDATE'te JOIN kullanılamaz).
+    """
+    from .models import Package
+
+    if profit_percent is None:
+        profit_percent = Subquery(Package.objects.filter(pk=OuterRef('package_id')).values('profit_percent')[:1])
+    else:
+        profit_percent = Value(Decimal(profit_percent))
+    # version artırılır ki açık düzenleme formları eski tutarı geri yazamasın
+    return queryset.update(
+        expected_return=expected_return_expression(profit_percent=profit_percent), version=F('version') + 1,
+    )
+
+
+def reprice_pending_investments(package, chunk_size=1000):
+    """
+    Paketin bekleyen yatırımlarını güncel getiri oranıyla yeniden fiyatlar. Her parça
+    kendi kısa transaction'ında güncellenir, tablo uzun süre kilitlenmez. Özetler yalnızca
+    onaylı yatırımları topladığından yenilenmez. Güncellenen satır sayısını döner.
+    """
+    from .models import Investment
+
+    pending = Investment.objects.filter(package=package, status=Investment.STATUS_PENDING)
+    updated, last_pk = 0, 0
+    while True:
+        chunk = list(pending.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1]
+        with transaction.atomic():
+            # Parça okunduktan sonra onaylanmış olabilecek satırlar status koşuluyla dışarıda kalır
+            updated += recalculate_expected_returns(pending.filter(pk__in=chunk), package.profit_percent)
+    return updated
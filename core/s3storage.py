@@ -0,0 +1,35 @@
+"""
+Dekontlar için S3 uyumlu içerik adresli depolama (AWS S3, MinIO vb.).
+django-storages[s3] gerektirir; yalnızca STORAGES['receipts'] bu sınıfı gösterdiğinde
+içe aktarılır (bkz. settings, RECEIPTS_S3_BUCKET).
+
+Yerel yol olmadığından korumalı medya sunumu imzalı URL'e yönlendirir (core.media).
+"""
+from botocore.exceptions import ClientError
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+from .storage import ContentAddressedStorageMixin
+
+
+class ContentAddressedS3Storage(ContentAddressedStorageMixin, S3Storage):
+    def touch(self, name):
+        # Nesnenin kendi üzerine kopyalanması LastModified'ı yeniler
+        obj = self.bucket.Object(self._normalize_name(clean_name(name)))
+        try:
+            obj.load()
+            obj.copy_from(
+                CopySource={'Bucket': self.bucket_name, 'Key': obj.key},
+                MetadataDirective='REPLACE', ContentType=obj.content_type, Metadata=obj.metadata,
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey'):
+                return False
+            raise
+        return True
+
+    def list_files(self, prefix):
+        # ListObjectsV2 anahtarları bayt sırasıyla döner
+        key_prefix = self._normalize_name(clean_name(prefix)).rstrip('/') + '/'
+        for obj in self.bucket.objects.filter(Prefix=key_prefix):
+            yield prefix + obj.key[len(key_prefix):], obj.size, obj.last_modified.timestamp()
@@ -0,0 +1,109 @@
+"""
+Admin araması. Kullanıcı adı, e-posta, ad-soyad, telefon ve dekontlardaki WhatsApp
+numaraları Profile.search_document sütununda küçük harfli tek metin olarak tutulur;
+böylece JOIN'li icontains taraması yerine indeksli bir alt dize araması yapılır:
+
+- PostgreSQL: search_document üzerindeki pg_trgm GIN indeksi (LIKE '%…%').
+- SQLite: core_profile_search FTS5 tablosu (trigram tokenizer).
+
+İndeksler migration 0030'da oluşturulur. SQLite'ta core_profile'ı yeniden kuran her
+migration (AlterField vb.) tablonun tetikleyicilerini de düşürür; FTS tablosu hata
+vermeden bayatlar. Bu yüzden her migrate sonunda eksik tetikleyiciler yeniden
+oluşturulur (restore_search_triggers, CoreConfig.ready).
+
+Paket adı kayda ait olduğundan profil metnine yazılmaz; birkaç satırlık paket tablosunda
+eşleşen paketler bulunup kaydın indeksli package_id sütunuyla süzülür.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Package, Profile
+
+# Trigram indeksleri 3 karakterden kısa parçaları eşleştiremez
+MIN_INDEXED_LENGTH = 3
+
+# 0030'daki tetikleyicilerle birebir aynı olmalı
+SQLITE_TRIGGERS = {
+    'core_profile_search_ai':
+        "CREATE TRIGGER core_profile_search_ai AFTER INSERT ON core_profile BEGIN "
+        "INSERT INTO core_profile_search(rowid, search_document) VALUES (new.id, new.search_document); END",
+    'core_profile_search_ad':
+        "CREATE TRIGGER core_profile_search_ad AFTER DELETE ON core_profile BEGIN "
+        "INSERT INTO core_profile_search(core_profile_search, rowid, search_document) "
+        "VALUES ('delete', old.id, old.search_document); END",
+    'core_profile_search_au':
+        "CREATE TRIGGER core_profile_search_au AFTER UPDATE OF search_document ON core_profile BEGIN "
+        "INSERT INTO core_profile_search(core_profile_search, rowid, search_document) "
+        "VALUES ('delete', old.id, old.search_document); "
+        "INSERT INTO core_profile_search(rowid, search_document) VALUES (new.id, new.search_document); END",
+}
+
+
+def ensure_search_triggers(using=DEFAULT_DB_ALIAS):
+    """
+    SQLite'ta FTS tablosu varken eksik olan tetikleyicileri oluşturur ve arada kaçırılmış
+    değişiklikler için indeksi baştan kurar. Oluşturulan tetikleyicilerin adlarını döner.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'core_profile_search' OR "
+            "(type = 'trigger' AND tbl_name = 'core_profile')"
+        )
+        existing = {name for (name,) in cursor.fetchall()}
+        if 'core_profile_search' not in existing:
+            return []  # 0030 henüz uygulanmamış (veya geri alınmış)
+        missing = [name for name in SQLITE_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(SQLITE_TRIGGERS[name])
+        if missing:
+            cursor.execute("INSERT INTO core_profile_search(core_profile_search) VALUES ('rebuild')")
+    return missing
+
+
+def restore_search_triggers(using=DEFAULT_DB_ALIAS, verbosity=1, stdout=None, **kwargs):
+    """post_migrate alıcısı."""
+    missing = ensure_search_triggers(using)
+    if missing and verbosity and stdout is not None:
+        stdout.write(f"  Arama tetikleyicileri yeniden oluşturuldu: {', '.join(missing)}")
+
+
+def _fts_phrase(word):
+    return '"%s"' % word.replace('"', '""')
+
+
+def matching_profiles(word, using='default'):
+    """Kelimeyi içeren profillerin ID'leri (alt sorgu olarak kullanılır)."""
+    profiles = Profile.objects.using(using)
+    if connections[using].vendor == 'sqlite' and len(word) >= MIN_INDEXED_LENGTH:
+        profiles = profiles.filter(pk__in=RawSQL(
+            'SELECT rowid FROM core_profile_search WHERE core_profile_search MATCH %s', [_fts_phrase(word)],
+        ))
+    else:
+        profiles = profiles.filter(search_document__contains=word)
+    return profiles.values('pk')
+
+
+def search(queryset, term, profile_lookup='profile', package_lookup=None):
+    """
+    queryset'i profil araması ile süzer. `profile_lookup`, modelden profile giden yol
+    ('' ise queryset'in kendisi Profile'dır); `package_lookup` verilirse kelimeler paket
+    adıyla da eşleşir. Her kelime eşleşmelidir. Sayısal terimler kaydın ID'si ile de eşleşir.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+    field = f'{profile_lookup}__in' if profile_lookup else 'pk__in'
+    condition = Q()
+    for word in term.lower().split():
+        word_condition = Q(**{field: matching_profiles(word, queryset.db)})
+        if package_lookup:
+            packages = Package.objects.using(queryset.db).filter(name__icontains=word).values('pk')
+            word_condition |= Q(**{f'{package_lookup}__in': packages})
+        condition &= word_condition
+    if term.lstrip('#').isdigit():
+        condition |= Q(pk=int(term.lstrip('#')))
+    return queryset.filter(condition)
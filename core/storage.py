@@ -0,0 +1,165 @@
+import hashlib
+import os
+import posixpath
+from datetime import timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage, storages
+from django.utils import timezone
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .assets import (
+    RESPONSIVE_IMAGE_EXTENSIONS, VENDOR_ASSETS, render_variants, subresource_integrity, variant_name, variant_pattern,
+)
+
+
+class OptimizedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    collectstatic sırasında PNG/JPEG görseller için boyutlandırılmış WebP/AVIF
+    varyantları üretir. Varyantlar da manifest'e girer (hash'lenir) ve WhiteNoise
+    metin dosyaları için gzip/Brotli kopyalarını üretmeye devam eder.
+
+    VENDOR_ASSETS'teki dosyalardan biri static/ altında yoksa (vendor_static
+    çalıştırılmamış) ya da kayıtlı özetiyle uyuşmuyorsa toplama yarıda kesilir.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        problems = []
+        for path, (_url, integrity) in VENDOR_ASSETS.items():
+            if path not in paths:
+                problems.append(f"{path} (yok)")
+                continue
+            storage, source_path = paths[path]
+            if integrity:
+                with storage.open(source_path) as source:
+                    if subresource_integrity(source.read()) != integrity:
+                        problems.append(f"{path} (özet uyuşmuyor)")
+        if problems:
+            raise ImproperlyConfigured(
+                f"Üçüncü parti static dosyalar hazır değil: {', '.join(problems)}. "
+                "`manage.py vendor_static` çalıştırın."
+            )
+        if not dry_run:
+            paths = dict(paths)
+            for path, (storage, source_path) in list(paths.items()):
+                if path.lower().endswith(RESPONSIVE_IMAGE_EXTENSIONS):
+                    for name in self._save_image_variants(storage, source_path, path):
+                        paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def _save_image_variants(self, storage, source_path, path):
+        # Kaynak değişmediyse önceki collectstatic'in ürettiği varyantlar kullanılır
+        directory = posixpath.dirname(path)
+        pattern = variant_pattern(path)
+        existing = [
+            posixpath.join(directory, name) for name in self.listdir(directory)[1]
+            if pattern.match(posixpath.join(directory, name))
+        ] if self.exists(directory) else []
+        if existing and min(map(self.get_modified_time, existing)) >= storage.get_modified_time(source_path):
+            return existing
+
+        names = []
+        with storage.open(source_path) as source:
+            for width, fmt, data in render_variants(source):
+                name = variant_name(path, width, fmt)
+                if self.exists(name):
+                    self.delete(name)
+                self._save(name, ContentFile(data))
+                names.append(name)
+        return names
+
+
+class ContentAddressedStorageMixin:
+    """
+    Dosyaları içeriklerinin SHA-256 özetiyle saklar:
+        payment_screenshots/ab/cd/abcd…ef.png
+    Aynı içerik ikinci kez yüklendiğinde yeni dosya yazılmaz, mevcut ad döner.
+
+    Özet, yükleme sırasında core.uploadhandlers tarafından hesaplanıp dosyaya
+    `sha256` olarak eklenir; yoksa (ör. shell'den kaydedilen dosyalar) burada
+    hesaplanır. Yalnızca exists()/save() kullandığı için S3 uyumlu backend'lerle de
+    birleştirilebilir (core.s3storage.ContentAddressedS3Storage, MinIO dahil).
+    Alt sınıflar touch() ve gc_media'nın kullandığı list_files()'ı sağlar.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = getattr(content, 'sha256', None) or self._digest(content)
+        extension = posixpath.splitext(name)[1].lower()
+        name = posixpath.join(posixpath.dirname(name), digest[:2], digest[2:4], digest + extension)
+        # Mevcut dosya sahipsiz kalmış eski bir kopya olabilir; zamanı yenilenir ki kaydı
+        # commit edilene kadar gc_media ve post_delete onu silmesin (recently_written)
+        if self.exists(name) and self.touch(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def touch(self, name):
+        """
+        Dosyanın değiştirilme zamanını yeniler; dosya bu arada silinmişse False döner.
+        Nesne depolarında (S3) zaman yeniden yazmadan değişmez; varsayılan yalnızca
+        dosyanın var olduğunu kabul eder.
+        """
+        return True
+
+    def list_files(self, prefix):
+        """prefix altındaki dosyaları ada göre sıralı (ad, boyut, değiştirilme zamanı) olarak verir."""
+        raise NotImplementedError
+
+    def _digest(self, content):
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        return sha256.hexdigest()
+
+
+def walk_sorted(root, prefix=''):
+    """
+    Dizin ağacını, göreli yolların karakter sırasına göre (dosya ve alt dizinler
+    karışık) gezer. Dizinler 'ad/' anahtarıyla sıralanır ki çıktı, veritabanındaki
+    sıralı isim listesiyle birebir karşılaştırılabilsin.
+    """
+    with os.scandir(root) as it:
+        entries = sorted(it, key=lambda e: e.name + '/' if e.is_dir(follow_symlinks=False) else e.name)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from walk_sorted(entry.path, f'{prefix}{entry.name}/')
+        elif entry.is_file(follow_symlinks=False):
+            yield f'{prefix}{entry.name}', entry.stat()
+
+
+class ContentAddressedFileSystemStorage(ContentAddressedStorageMixin, FileSystemStorage):
+    def touch(self, name):
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def list_files(self, prefix):
+        root = self.path(prefix)
+        if not os.path.isdir(root):
+            return
+        for relative, stat in walk_sorted(root):
+            yield prefix + relative, stat.st_size, stat.st_mtime
+
+
+# Bu süreden yeni dekont dosyaları hiçbir kayıt kullanmıyor görünse de silinmez:
+# yükleme dosyayı kayıt commit edilmeden önce yazar ya da zamanını yeniler
+ORPHAN_GRACE = timedelta(hours=1)
+
+
+def recently_written(storage, name, grace=ORPHAN_GRACE):
+    try:
+        modified = storage.get_modified_time(name)
+    except (FileNotFoundError, NotImplementedError):
+        return False
+    return modified > timezone.now() - grace
+
+
+def receipt_storage():
+    return storages['receipts']
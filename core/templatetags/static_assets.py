@@ -0,0 +1,70 @@
+import mimetypes
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from core.assets import VENDOR_ASSETS, collected_variants
+
+register = template.Library()
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+
+def _srcset(items):
+    return ', '.join(f'{static(name)} {width}w' for width, name in items)
+
+
+@register.simple_tag
+def vendor_static(path):
+    """static/vendor/ altındaki, core.assets.VENDOR_ASSETS'te kayıtlı dosyanın static URL'i."""
+    if path not in VENDOR_ASSETS:
+        raise ValueError(f"{path} VENDOR_ASSETS'te kayıtlı değil.")
+    return static(path)
+
+
+@register.simple_tag
+def picture(path, alt='', sizes='100vw', **attrs):
+    """
+    {% picture 'images/paribu.png' alt='Paribu' sizes='80px' class='platform-logo' %}
+
+    collectstatic'in ürettiği AVIF/WebP varyantları için <source> etiketleri ekler;
+    varyant yoksa (ör. DEBUG) düz <img> olarak kalır.
+    """
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[fmt], _srcset(items), sizes) for fmt, items in collected_variants(path).items()),
+    )
+    img_attrs = format_html_join(' ', '{}="{}"', attrs.items())
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}" loading="lazy" decoding="async" {}></picture>',
+        sources, static(path), alt, img_attrs,
+    )
+
+
+@register.simple_tag
+def image_set(path):
+    """
+    CSS arka planları için, düz url() bildiriminden sonra kullanılır:
+        background-image: {% image_set 'images/hero-bg.jpeg' %};
+    """
+    candidates = [
+        f'url("{static(items[-1][1])}") type("{MIME_TYPES[fmt]}")'
+        for fmt, items in collected_variants(path).items()
+    ]
+    candidates.append(f'url("{static(path)}") type("{mimetypes.guess_type(path)[0]}")')
+    return mark_safe(f'image-set({", ".join(candidates)})')
+
+
+@register.simple_tag
+def preload_image(path):
+    """image_set ile seçilecek dosya için <link rel="preload">; ilk boyamayı hızlandırır."""
+    variants = collected_variants(path)
+    for fmt in MIME_TYPES:
+        if fmt in variants:
+            return format_html(
+                '<link rel="preload" as="image" href="{}" type="{}">',
+                static(variants[fmt][-1][1]), MIME_TYPES[fmt],
+            )
+    return format_html('<link rel="preload" as="image" href="{}">', static(path))
@@ -1,3 +1,1169 @@
-from django.test import TestCase
+"""
+python manage.py test --settings=wafelinvest.settings_test [--parallel]
 
-# Create your tests here.
+Veriler her sınıfta setUpTestData ile kurulur; testler sabit ID'lere güvenmez,
+böylece paralel süreçlerin her biri kendi veritabanı kopyasında çalışabilir.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import runpy
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+from xml.etree import ElementTree
+
+from django.conf import settings as django_settings
+from django.contrib import admin
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.db.models import F
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .assets import VENDOR_ASSETS, subresource_integrity
+from .backends import ProfileBackend
+from .forms import RegisterForm
+from .imports import import_csv
+from . import middleware, phash, warmup
+from .models import (
+    ConcurrentUpdateError, IdempotencyKey, Investment, InvestmentEvent, Package, PaymentConfirmation, Profile,
+    ProjectionCheckpoint, UserInvestmentSummary,
+)
+from .ratelimit import check_shared_cache, client_ip, hit
+from .search import SQLITE_TRIGGERS, search
+from .storage import OptimizedStaticFilesStorage
+from .returns import expected_return, recalculate_expected_returns, reprice_pending_investments
+from .templatetags.static_assets import vendor_static
+
+# Küsuratsız tutarlar SQLite'ta INTEGER saklanır; kuruşlu ve .xx5 sınırındaki tutarlar da var
+AMOUNTS = [Decimal(value) for value in (
+    '1', '7', '100', '1001', '1001.00', '1996', '2015.5', '0.05', '0.15', '10.01',
+    '33.33', '99.99', '123.45', '1234567.89',
+)]
+PERCENTS = (0, 1, 7, 15, 33, 50, 99, 100, 150)
+
+
+def make_profile(username):
+    return User.objects.create_user(username, f'{username}@example.com', 'parola-123456').profile
+
+
+def make_package(name='Deneme Paketi', profit_percent=15):
+    return Package.objects.create(name=name, price=500, duration_days=30, profit_percent=profit_percent)
+
+
+def image_bytes(color, size=(64, 48)):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def make_confirmation(profile, package, content):
+    investment = Investment.objects.create(profile=profile, package=package, amount=Decimal('100'))
+    return PaymentConfirmation.objects.create(
+        investment=investment, whatsapp_number='5550000000',
+        payment_screenshot=SimpleUploadedFile('dekont.png', content, 'image/png'),
+    )
+
+
+class MediaRootMixin:
+    """Her test kendi MEDIA_ROOT'unda çalışır; paralel süreçler aynı dosyalara dokunmaz."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp(prefix='wafelinvest-test-')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = self.settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def age(self, confirmation_or_name, hours=2):
+        name = getattr(confirmation_or_name, 'payment_screenshot', confirmation_or_name)
+        path = PaymentConfirmation._meta.get_field('payment_screenshot').storage.path(str(name))
+        past = time.time() - hours * 3600
+        os.utime(path, (past, past))
+        return path
+
+
+class ExpectedReturnTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('yatirimci')
+        cls.packages = [
+            Package.objects.create(name=f'%{percent}', price=100, duration_days=30, profit_percent=percent)
+            for percent in PERCENTS
+        ]
+        Investment.objects.bulk_create([
+            Investment(profile=cls.profile, package=package, amount=amount)
+            for package in cls.packages for amount in AMOUNTS
+        ])
+
+    def assertMatchesPython(self, queryset):
+        rows = queryset.values_list('amount', 'package__profit_percent', 'expected_return')
+        mismatches = [
+            (amount, percent, stored) for amount, percent, stored in rows
+            if stored != expected_return(amount, percent)
+        ]
+        self.assertEqual(mismatches, [])
+
+    def test_save_uses_python_formula(self):
+        investment = Investment.objects.create(profile=self.profile, package=self.packages[3], amount=Decimal('1001'))
+        investment.refresh_from_db()
+        self.assertEqual(investment.expected_return, Decimal('1151.15'))
+
+    def test_recalculate_from_package(self):
+        recalculate_expected_returns(Investment.objects.all())
+        self.assertMatchesPython(Investment.objects.all())
+
+    def test_recalculate_with_given_percent(self):
+        for package in self.packages:
+            recalculate_expected_returns(Investment.objects.filter(package=package), package.profit_percent)
+        self.assertMatchesPython(Investment.objects.all())
+
+    def test_reprice_pending_keeps_cents(self):
+        package = self.packages[3]
+        approved = Investment.objects.create(
+            profile=self.profile, package=package, amount=Decimal('1001'), status=Investment.STATUS_APPROVED,
+        )
+        package.profit_percent = 33
+        package.save()
+
+        updated = reprice_pending_investments(package, chunk_size=5)
+
+        self.assertEqual(updated, len(AMOUNTS))
+        self.assertMatchesPython(Investment.objects.filter(package=package, status=Investment.STATUS_PENDING))
+        repriced = Investment.objects.filter(package=package, amount=Decimal('1001'), status=Investment.STATUS_PENDING)
+        self.assertEqual(set(repriced.values_list('expected_return', flat=True)), {Decimal('1331.33')})
+        approved.refresh_from_db()
+        self.assertEqual(approved.expected_return, Decimal('1151.15'))
+
+
+@override_settings(RATELIMIT_ENABLED=True, RATELIMIT_IP_META_KEY='HTTP_X_FORWARDED_FOR', RATELIMIT_TRUSTED_PROXIES=1)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_client_ip_uses_address_appended_by_proxy(self):
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='1.1.1.1, 203.0.113.7')
+        self.assertEqual(client_ip(request), '203.0.113.7')
+        with self.settings(RATELIMIT_TRUSTED_PROXIES=2):
+            request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='1.1.1.1, 203.0.113.7, 10.0.0.2')
+            self.assertEqual(client_ip(request), '203.0.113.7')
+            # Listede güvenilen proxy sayısından az adres varsa en soldaki alınır
+            request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='203.0.113.7')
+            self.assertEqual(client_ip(request), '203.0.113.7')
+
+    def test_spoofed_forwarded_for_does_not_reset_limit(self):
+        url = reverse('login')
+        statuses = [
+            self.client.post(
+                url, {'username': 'x', 'password': 'y'}, secure=True,
+                HTTP_X_FORWARDED_FOR=f'198.51.100.{i}, 203.0.113.7',
+            ).status_code
+            for i in range(11)
+        ]
+        self.assertNotIn(429, statuses[:10])
+        self.assertEqual(statuses[10], 429)
+
+    def test_concurrent_hits_never_exceed_limit(self):
+        barrier = threading.Barrier(20)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(hit('eszamanli', '5/m'))
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(0), 5)
+        self.assertTrue(all(0 < retry_after <= 60 for retry_after in results if retry_after))
+
+    def test_previous_window_counts_towards_limit(self):
+        with mock.patch('core.ratelimit.time.time', return_value=6000 + 59):
+            self.assertEqual([hit('kayan', '4/m') for _ in range(4)], [0, 0, 0, 0])
+        # Yeni pencerenin başında önceki pencere neredeyse tamamen sayılır
+        with mock.patch('core.ratelimit.time.time', return_value=6060 + 6):
+            self.assertGreater(hit('kayan', '4/m'), 0)
+        with mock.patch('core.ratelimit.time.time', return_value=6060 + 30):
+            self.assertEqual([hit('kayan', '4/m') for _ in range(2)], [0, 0])
+            self.assertGreater(hit('kayan', '4/m'), 0)
+
+    def test_multiple_workers_require_shared_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            check_shared_cache(workers=3)
+        check_shared_cache(workers=1)
+        with self.settings(RATELIMIT_ENABLED=False):
+            check_shared_cache(workers=3)
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            check_shared_cache(workers=3)
+
+    def test_limit_is_per_client(self):
+        url = reverse('login')
+        for _ in range(10):
+            self.client.post(url, {}, secure=True, HTTP_X_FORWARDED_FOR='203.0.113.7')
+        self.assertEqual(self.client.post(url, {}, secure=True, HTTP_X_FORWARDED_FOR='203.0.113.7').status_code, 429)
+        self.assertNotEqual(self.client.post(url, {}, secure=True, HTTP_X_FORWARDED_FOR='203.0.113.8').status_code, 429)
+
+
+def csv_stream(data):
+    return io.TextIOWrapper(io.BytesIO(data), encoding='utf-8-sig', newline='')
+
+
+class CSVImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('aktarilan')
+        cls.package = Package.objects.create(name='Altın', price=100, duration_days=30, profit_percent=10)
+        # TextIOWrapper 8 KB'lık bloklar okur; bozuk satır ilk parçalar yazıldıktan sonra gelir
+        cls.valid_rows = ''.join(f'aktarilan,Altın,{100 + i},approved\n' for i in range(400)).encode()
+
+    def assertSummaryRebuilt(self, created):
+        summary = UserInvestmentSummary.objects.get(profile=self.profile)
+        self.assertEqual(summary.total_invested, sum(Decimal(100 + i) for i in range(created)))
+
+    def test_valid_file(self):
+        report = import_csv('investments', csv_stream(b'username,package,amount,status\n' + self.valid_rows))
+        self.assertEqual((report.created, report.errors), (400, []))
+        self.assertSummaryRebuilt(400)
+
+    def test_non_utf8_file_is_reported_and_summaries_rebuilt(self):
+        data = b'username,package,amount,status\n' + self.valid_rows + 'aktarılan,Altın,5,approved\n'.encode('cp1254')
+        report = import_csv('investments', csv_stream(data), chunk_size=50)
+        self.assertEqual(len(report.errors), 1)
+        self.assertIn('UTF-8', report.errors[0][1])
+        self.assertGreater(report.created, 0)
+        self.assertSummaryRebuilt(report.created)
+
+    def test_malformed_csv_is_reported(self):
+        data = b'username,package,amount,status\n' + self.valid_rows[:200] + b'"' + b'x' * 200_000 + b'"\n'
+        report = import_csv('investments', csv_stream(data))
+        self.assertEqual(len(report.errors), 1)
+        self.assertIn('CSV', report.errors[0][1])
+
+    def test_events_carry_imported_timestamps(self):
+        data = (
+            b'username,package,amount,status,created_at,approved_at\n'
+            b'aktarilan,Alt\xc4\xb1n,100,approved,2024-01-05T10:00:00Z,2024-01-06T12:00:00Z\n'
+            b'aktarilan,Alt\xc4\xb1n,200,pending,2024-02-01T09:00:00Z,\n'
+        )
+        report = import_csv('investments', csv_stream(data))
+        self.assertEqual((report.created, report.errors), (2, []))
+        events = InvestmentEvent.objects.filter(investment__profile=self.profile).order_by('created_at', 'id')
+        self.assertEqual(
+            [(event.investment.amount, event.from_status, event.to_status, event.created_at.isoformat()) for event in events],
+            [
+                (Decimal('100'), '', 'pending', '2024-01-05T10:00:00+00:00'),
+                (Decimal('100'), 'pending', 'approved', '2024-01-06T12:00:00+00:00'),
+                (Decimal('200'), '', 'pending', '2024-02-01T09:00:00+00:00'),
+            ],
+        )
+
+    def test_admin_import_view_does_not_fail_on_encoding(self):
+        User.objects.create_superuser('yonetici', 'yonetici@example.com', 'parola-123456')
+        self.client.login(username='yonetici', password='parola-123456')
+        upload = SimpleUploadedFile('yatirimlar.csv', 'username,package,amount\naktarılan,Altın,5\n'.encode('cp1254'))
+        response = self.client.post(
+            reverse('admin:core_investment_import'), {'kind': 'investments', 'csv_file': upload}, secure=True,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['skipped'], 1)
+
+
+class ReceiptStorageTests(MediaRootMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('dekontcu')
+        cls.package = Package.objects.create(name='Gümüş', price=100, duration_days=30, profit_percent=10)
+
+    def test_same_content_is_stored_once(self):
+        first = make_confirmation(self.profile, self.package, image_bytes('red'))
+        second = make_confirmation(self.profile, self.package, image_bytes('red'))
+        self.assertEqual(first.payment_screenshot.name, second.payment_screenshot.name)
+
+    def test_dedup_hit_refreshes_orphan_mtime(self):
+        confirmation = make_confirmation(self.profile, self.package, image_bytes('blue'))
+        path = self.age(confirmation)
+        # on_commit çalıştırılmadığından dosya sahipsiz olarak kalır
+        PaymentConfirmation.objects.filter(pk=confirmation.pk).delete()
+        self.assertGreater(time.time() - os.path.getmtime(path), 3600)
+
+        make_confirmation(self.profile, self.package, image_bytes('blue'))
+        self.assertLess(time.time() - os.path.getmtime(path), 60)
+        call_command('gc_media', '--delete', stdout=io.StringIO())
+        self.assertTrue(os.path.exists(path))
+
+    def test_gc_deletes_only_old_unreferenced_files(self):
+        kept = make_confirmation(self.profile, self.package, image_bytes('green'))
+        orphan = make_confirmation(self.profile, self.package, image_bytes('yellow'))
+        fresh = make_confirmation(self.profile, self.package, image_bytes('white'))
+        kept_path, orphan_path = self.age(kept), self.age(orphan)
+        fresh_path = PaymentConfirmation._meta.get_field('payment_screenshot').storage.path(fresh.payment_screenshot.name)
+        # Dosyaları bırakarak kayıtları sil (post_delete sinyali olmadan)
+        PaymentConfirmation.objects.filter(pk__in=[orphan.pk, fresh.pk])._raw_delete(PaymentConfirmation.objects.db)
+
+        call_command('gc_media', '--delete', stdout=io.StringIO())
+
+        self.assertTrue(os.path.exists(kept_path))
+        self.assertFalse(os.path.exists(orphan_path))
+        self.assertTrue(os.path.exists(fresh_path))
+
+    def test_post_delete_keeps_shared_and_recent_files(self):
+        first = make_confirmation(self.profile, self.package, image_bytes('black'))
+        second = make_confirmation(self.profile, self.package, image_bytes('black'))
+        path = self.age(first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))  # ikinci kayıt hâlâ kullanıyor
+
+        os.utime(path)  # aynı içerik yeniden yükleniyor
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertTrue(os.path.exists(path))
+
+        self.age(path)
+        make_confirmation(self.profile, self.package, image_bytes('black'))
+        confirmation = PaymentConfirmation.objects.get(payment_screenshot=str(first.payment_screenshot))
+        self.age(path)
+        with self.captureOnCommitCallbacks(execute=True):
+            confirmation.delete()
+        self.assertFalse(os.path.exists(path))
+
+
+class ExportCommandTests(TestCase):
+    def test_invalid_date_is_rejected(self):
+        for value in ('2024/01/01', '2024-02-30', 'dün'):
+            with self.subTest(value=value), self.assertRaisesMessage(CommandError, 'geçerli bir tarih değil'):
+                call_command('export_data', 'investments', '--since', value, stdout=io.StringIO())
+
+    def test_since_filters_rows(self):
+        profile = make_profile('aktaran')
+        package = Package.objects.create(name='Bronz', price=100, duration_days=30, profit_percent=10)
+        Investment.objects.create(profile=profile, package=package, amount=Decimal('100'))
+        output = os.path.join(tempfile.mkdtemp(prefix='wafelinvest-test-'), 'yatirimlar.csv')
+        self.addCleanup(shutil.rmtree, os.path.dirname(output))
+        call_command('export_data', 'investments', '--since', '2999-01-01', '-o', output)
+        with open(output, encoding='utf-8-sig') as f:
+            self.assertEqual(len(f.read().splitlines()), 1)  # yalnızca başlık
+
+
+def xlsx_rows(data):
+    namespace = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+    return [
+        [cell.findtext('s:is/s:t', namespaces=namespace) or cell.findtext('s:v', namespaces=namespace)
+         for cell in row.findall('s:c', namespace)]
+        for row in sheet.iterfind('s:sheetData/s:row', namespace)
+    ]
+
+
+class InvestmentEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('olayli')
+        cls.package = make_package()
+        cls.admin = User.objects.create_user('onaylayan', 'onaylayan@example.com', 'parola-123456', is_staff=True)
+
+    def history(self, investment):
+        return list(investment.events.values_list('from_status', 'to_status'))
+
+    def test_one_event_per_status_change(self):
+        investment = Investment.objects.create(profile=self.profile, package=self.package, amount=Decimal('100'))
+        investment.amount = Decimal('150')
+        investment.save()
+        investment.transition(Investment.STATUS_APPROVED, actor=self.admin)
+        investment.transition(Investment.STATUS_APPROVED, actor=self.admin)
+        investment.status = Investment.STATUS_CANCELLED
+        investment.save()
+        Investment.objects.filter(pk=investment.pk).transition(Investment.STATUS_REFUNDED)
+        Investment.objects.filter(pk=investment.pk).transition(Investment.STATUS_REFUNDED)
+
+        self.assertEqual(self.history(investment), [
+            ('', 'pending'), ('pending', 'approved'), ('approved', 'cancelled'), ('cancelled', 'refunded'),
+        ])
+        self.assertEqual(investment.events.get(to_status='approved').actor, self.admin)
+
+    def test_events_cannot_be_changed(self):
+        event = Investment.objects.create(profile=self.profile, package=self.package, amount=Decimal('100')).events.get()
+        with self.assertRaises(ValueError):
+            event.save()
+        with self.assertRaises(ValueError):
+            event.delete()
+
+    def replay(self):
+        out = io.StringIO()
+        call_command('replay_events', 'investment_summaries', stdout=out)
+        return out.getvalue().strip()
+
+    def test_replay_advances_checkpoint(self):
+        investment = Investment.objects.create(profile=self.profile, package=self.package, amount=Decimal('100'))
+        investment.transition(Investment.STATUS_APPROVED)
+        summary = UserInvestmentSummary.objects.get(profile=self.profile)
+        self.assertEqual(summary.total_invested, Decimal('100'))
+        UserInvestmentSummary.objects.filter(pk=summary.pk).update(total_invested=0)
+
+        # Son birkaç saniyedeki olaylar henüz commit edilmemiş olabilir; bekletilir
+        self.assertEqual(self.replay(), 'investment_summaries: 0 olay işlendi.')
+        InvestmentEvent.objects.update(created_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.replay(), 'investment_summaries: 2 olay işlendi.')
+        checkpoint = ProjectionCheckpoint.objects.get(name='investment_summaries')
+        self.assertEqual(checkpoint.last_event_id, investment.events.latest('pk').pk)
+        self.assertEqual(UserInvestmentSummary.objects.get(pk=summary.pk).total_invested, Decimal('100'))
+
+        self.assertEqual(self.replay(), 'investment_summaries: 0 olay işlendi.')
+        investment.transition(Investment.STATUS_CANCELLED)
+        InvestmentEvent.objects.update(created_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.replay(), 'investment_summaries: 1 olay işlendi.')
+
+        with self.assertRaisesMessage(CommandError, 'Bilinmeyen projeksiyon'):
+            call_command('replay_events', 'yok', stdout=io.StringIO())
+
+
+class ReviewQueueTests(MediaRootMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('kuyruk')
+        cls.package = make_package()
+        cls.first = User.objects.create_user('inceleyen1', 'inceleyen1@example.com', 'parola-123456', is_staff=True)
+        cls.second = User.objects.create_user('inceleyen2', 'inceleyen2@example.com', 'parola-123456', is_staff=True)
+
+    def setUp(self):
+        super().setUp()
+        colors = ('red', 'green', 'blue', 'yellow')
+        self.confirmations = [make_confirmation(self.profile, self.package, image_bytes(color)) for color in colors]
+
+    def claim(self, reviewer, limit=2):
+        return set(PaymentConfirmation.objects.claim(reviewer, limit, PaymentConfirmation.REVIEW_LEASE))
+
+    def test_reviewers_get_disjoint_rows(self):
+        first, second = self.claim(self.first), self.claim(self.second)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 2)
+        self.assertFalse(first & second)
+        # Süresi dolmamış sahiplenmeler tekrar çağrıda aynen döner, kuyruk boşsa başkası alamaz
+        self.assertEqual(self.claim(self.first), first)
+        self.assertEqual(self.claim(User.objects.create_user('inceleyen3')), set())
+
+    def test_expired_claims_are_reclaimed(self):
+        self.claim(self.first)
+        PaymentConfirmation.objects.filter(claimed_by=self.first).update(
+            claim_expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(self.claim(self.second, limit=4), set(self.confirmations))
+
+    def test_interleaved_claim_does_not_steal_rows(self):
+        # İkinci inceleyici boş satırları okuduktan sonra, UPDATE'inden önce birincisi aynı
+        # satırları sahiplenir (kilit desteği olmayan veritabanındaki yarış)
+        manager_filter = PaymentConfirmation.objects.filter
+        first = set()
+
+        def filter_after_race(*args, **kwargs):
+            if not first and kwargs.get('pk__in') is not None:
+                with mock.patch.object(PaymentConfirmation.objects, 'filter', manager_filter):
+                    first.update(self.claim(self.first, limit=4))
+            return manager_filter(*args, **kwargs)
+
+        with mock.patch.object(PaymentConfirmation.objects, 'filter', filter_after_race):
+            second = self.claim(self.second)
+        self.assertEqual(first, set(self.confirmations))
+        self.assertEqual(second, set())
+        self.assertFalse(PaymentConfirmation.objects.filter(claimed_by=self.second).exists())
+
+
+class ProfileBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('oturumlu')
+        cls.investment = Investment.objects.create(profile=cls.profile, package=make_package(), amount=Decimal('100'))
+        UserInvestmentSummary.objects.rebuild([cls.profile.pk])
+
+    def setUp(self):
+        caches['default'].clear()
+        self.backend = ProfileBackend()
+
+    def load(self, queries):
+        with self.assertNumQueries(queries):
+            user = self.backend.get_user(self.profile.user_id)
+        with self.assertNumQueries(0):
+            user.profile.investment_summary.total_invested
+        return user
+
+    def test_user_profile_and_summary_in_one_query(self):
+        user = self.load(1)
+        self.assertEqual(user.profile.investment_summary.total_invested, 0)
+        self.assertIsNone(self.backend.get_user(0))
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60, AUTH_USER_CACHE='default')
+    def test_cached_user_is_forgotten_on_change(self):
+        self.load(1)
+        self.load(0)
+        self.profile.user.first_name = 'Yeni'
+        self.profile.user.save()
+        self.assertEqual(self.load(1).first_name, 'Yeni')
+
+        self.investment.transition(Investment.STATUS_APPROVED)
+        self.assertEqual(self.load(1).profile.investment_summary.total_invested, Decimal('100'))
+
+        Profile.objects.get(pk=self.profile.pk).save()
+        self.load(1)
+        self.load(0)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60, AUTH_USER_CACHE='default')
+    def test_deactivated_user_is_rejected(self):
+        self.load(1)
+        user = self.profile.user
+        user.is_active = False
+        user.save()
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.backend.get_user(user.pk))
+
+
+@skipUnless(middleware.brotli, "Brotli kurulu değil")
+class CompressionMiddlewareTests(TestCase):
+    body = ('<p>Wafelinvest yatırım paketleri</p>\n' * 200).encode()
+
+    def process(self, response, user=None, accept='gzip, deflate, br'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept)
+        request.user = user or AnonymousUser()
+        return middleware.CompressionMiddleware(lambda request: response).process_response(request, response)
+
+    def html(self, **kwargs):
+        return HttpResponse(self.body, content_type='text/html; charset=utf-8', **kwargs)
+
+    def test_brotli_for_anonymous_pages(self):
+        response = self.process(self.html())
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(middleware.brotli.decompress(response.content), self.body)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_gzip_when_brotli_not_accepted(self):
+        response = self.process(self.html(), accept='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_gzip_for_responses_that_may_carry_secrets(self):
+        with_csrf_cookie = self.html()
+        with_csrf_cookie.set_cookie(django_settings.CSRF_COOKIE_NAME, 'token')
+        self.assertEqual(self.process(with_csrf_cookie)['Content-Encoding'], 'gzip')
+        user = User.objects.create_user('sikistirilan')
+        self.assertEqual(self.process(self.html(), user=user)['Content-Encoding'], 'gzip')
+
+    def test_streaming_response_is_compressed_per_chunk(self):
+        chunks = [self.body[i:i + 1000] for i in range(0, len(self.body), 1000)]
+        response = self.process(StreamingHttpResponse(iter(chunks), content_type='text/csv'))
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(middleware.brotli.decompress(b''.join(response.streaming_content)), self.body)
+
+    def test_partial_and_event_stream_responses_are_not_compressed(self):
+        partial = self.html(status=206)
+        events = HttpResponse(self.body, content_type='text/event-stream')
+        for response in (partial, events):
+            self.assertFalse(self.process(response).has_header('Content-Encoding'))
+
+
+class ProtectedMediaTests(MediaRootMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_profile('dekont.sahibi')
+        cls.stranger = make_profile('yabanci')
+        cls.staff = User.objects.create_user('personel', 'personel@example.com', 'parola-123456', is_staff=True)
+        cls.package = make_package()
+
+    def setUp(self):
+        super().setUp()
+        self.content = image_bytes('orange')
+        self.confirmation = make_confirmation(self.owner, self.package, self.content)
+        self.url = reverse('payment_screenshot', args=[self.confirmation.pk])
+
+    def get(self, user, **extra):
+        self.client.force_login(user)
+        response = self.client.get(self.url, **extra)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_only_owner_and_staff_can_view(self):
+        for user, status in ((self.owner.user, 200), (self.staff, 200), (self.stranger.user, 404)):
+            with self.subTest(user=user.username):
+                self.assertEqual(self.get(user)[0].status_code, status)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_full_and_partial_content(self):
+        response, body = self.get(self.owner.user)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=3600')
+
+        response, body = self.get(self.owner.user, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.content[:10])
+        self.assertEqual(response['Content-Range'], f'bytes 0-9/{len(self.content)}')
+
+        response, body = self.get(self.owner.user, HTTP_RANGE='bytes=-5')
+        self.assertEqual(body, self.content[-5:])
+
+        response, _ = self.get(self.owner.user, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_stale_if_range_serves_full_content(self):
+        response, body = self.get(self.owner.user, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"eski"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+    @override_settings(MEDIA_ACCEL_BACKEND='nginx', MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_nginx_accel_redirect(self):
+        response, body = self.get(self.owner.user)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.confirmation.payment_screenshot.name}')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(body, b'')
+        self.assertEqual(self.get(self.stranger.user)[0].status_code, 404)
+
+
+class FormulaInjectionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('@kotu', '-kotu@example.com', 'parola-123456')
+        package = make_package(name='=HYPERLINK("http://example.com","Tıkla")')
+        cls.investment = Investment.objects.create(profile=user.profile, package=package, amount=Decimal('100'))
+        cls.admin = User.objects.create_superuser('yonetici', 'yonetici@example.com', 'parola-123456')
+
+    def assert_escaped(self, row):
+        self.assertEqual(row[1:4], ["'@kotu", "'-kotu@example.com", '\'=HYPERLINK("http://example.com","Tıkla")'])
+
+    def export_command(self, fmt):
+        output = io.BytesIO()
+        with mock.patch('sys.stdout', mock.Mock(buffer=output)):
+            call_command('export_data', 'investments', '--format', fmt)
+        return output.getvalue()
+
+    def admin_action(self, action):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('admin:core_investment_changelist'), {
+            'action': action, '_selected_action': [self.investment.pk],
+        })
+        return b''.join(response.streaming_content)
+
+    def test_csv_cells_are_escaped(self):
+        for data in (self.export_command('csv'), self.admin_action('export_csv')):
+            rows = list(csv.reader(io.StringIO(data.decode('utf-8-sig'))))
+            self.assertEqual(len(rows), 2)
+            self.assert_escaped(rows[1])
+            self.assertEqual(rows[1][4], '100.00')
+
+    def test_xlsx_cells_are_escaped(self):
+        for data in (self.export_command('xlsx'), self.admin_action('export_xlsx')):
+            rows = xlsx_rows(data)
+            self.assertEqual(len(rows), 2)
+            self.assert_escaped(rows[1])
+
+
+class PerceptualHashTests(MediaRootMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('ozetlenen')
+        cls.package = Package.objects.create(name='Platin', price=100, duration_days=30, profit_percent=10)
+
+    def test_decompression_bomb_is_treated_as_unreadable(self):
+        from PIL import Image
+
+        content = image_bytes('purple', size=(400, 400))
+        self.addCleanup(setattr, Image, 'MAX_IMAGE_PIXELS', Image.MAX_IMAGE_PIXELS)
+        Image.MAX_IMAGE_PIXELS = 100  # 400x400, sınırın iki katını aşar
+        self.assertIsNone(phash.dhash(io.BytesIO(content)))
+        confirmation = make_confirmation(self.profile, self.package, content)
+        self.assertEqual(confirmation.screenshot_hash, '')
+
+    def test_near_duplicate_is_flagged(self):
+        import random
+
+        from PIL import Image
+
+        def pattern(seed, size):
+            # Rastgele 9x8 gri desen büyütülür; yeniden boyutlanmış/JPEG'lenmiş kopyası aynı özeti verir
+            rng = random.Random(seed)
+            small = Image.new('L', (9, 8))
+            small.putdata([rng.randrange(256) for _ in range(72)])
+            buffer = io.BytesIO()
+            small.resize(size, Image.BICUBIC).convert('RGB').save(buffer, 'JPEG', quality=70)
+            return buffer.getvalue()
+
+        first = make_confirmation(self.profile, self.package, pattern(1, (180, 160)))
+        resized = make_confirmation(self.profile, self.package, pattern(1, (170, 150)))
+        different = make_confirmation(self.profile, self.package, pattern(2, (180, 160)))
+        self.assertEqual(resized.possible_duplicate_id, first.pk)
+        self.assertIsNone(different.possible_duplicate_id)
+
+
+class ProfileSearchTests(MediaRootMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('ayse.yilmaz')
+
+    def search_profiles(self, term):
+        return list(search(Profile.objects.all(), term, profile_lookup='').values_list('user__username', flat=True))
+
+    def test_search_by_username_fragment_and_id(self):
+        self.assertEqual(self.search_profiles('yilma'), ['ayse.yilmaz'])
+        self.assertEqual(self.search_profiles(f'#{self.profile.pk}'), ['ayse.yilmaz'])
+
+    def admin_search(self, model, term):
+        model_admin = admin.site._registry[model]
+        queryset, _ = model_admin.get_search_results(None, model.objects.all(), term)
+        return list(queryset)
+
+    def test_admin_search_matches_package_name_and_whatsapp_number(self):
+        other = make_profile('mehmet.kaya')
+        confirmation = make_confirmation(self.profile, make_package('Gold Paket'), image_bytes('red'))
+        investment = confirmation.investment
+        Investment.objects.create(profile=other, package=make_package('Silver Paket'), amount=Decimal('100'))
+
+        self.assertEqual(self.admin_search(Investment, 'gold'), [investment])
+        self.assertEqual(self.admin_search(Investment, 'ayse gold'), [investment])
+        self.assertEqual(self.admin_search(Investment, 'mehmet gold'), [])
+        self.assertEqual(self.admin_search(PaymentConfirmation, 'gold'), [confirmation])
+        self.assertEqual(self.admin_search(PaymentConfirmation, '5550000'), [confirmation])
+
+        confirmation.whatsapp_number = '+905321112233'
+        confirmation.save()
+        self.assertEqual(self.admin_search(PaymentConfirmation, '5550000'), [])
+        self.assertEqual(self.admin_search(PaymentConfirmation, '5321112233'), [confirmation])
+
+    def test_post_migrate_restores_dropped_triggers(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("FTS tetikleyicileri yalnızca SQLite'ta")
+        with connection.cursor() as cursor:
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {name}')
+        make_profile('tetik.kayboldu')
+        self.assertEqual(self.search_profiles('kayboldu'), [])
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db=connection.alias)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'core_profile'")
+            self.assertEqual({name for (name,) in cursor.fetchall()}, set(SQLITE_TRIGGERS))
+        # Kaçırılan değişiklik yeniden kurulumla, sonrakiler tetikleyicilerle indekslenir
+        self.assertEqual(self.search_profiles('kayboldu'), ['tetik.kayboldu'])
+        make_profile('tetik.geri')
+        self.assertEqual(self.search_profiles('geri'), ['tetik.geri'])
+
+
+class VendorAssetTests(TestCase):
+    path = 'vendor/ornek/ornek.js'
+    url = 'https://cdn.example.com/ornek@1.0.0/ornek.js'
+
+    def setUp(self):
+        self.static_dir = tempfile.mkdtemp(prefix='wafelinvest-test-static-')
+        self.addCleanup(shutil.rmtree, self.static_dir, ignore_errors=True)
+
+    def register(self, integrity):
+        patcher = mock.patch.dict(VENDOR_ASSETS, {self.path: (self.url, integrity)}, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, data):
+        os.makedirs(os.path.join(self.static_dir, 'vendor/ornek'), exist_ok=True)
+        with open(os.path.join(self.static_dir, self.path), 'wb') as f:
+            f.write(data)
+
+    def post_process(self):
+        source = FileSystemStorage(location=self.static_dir)
+        paths = {self.path: (source, self.path)} if source.exists(self.path) else {}
+        return list(OptimizedStaticFilesStorage().post_process(paths, dry_run=True))
+
+    def vendor_static_command(self, response=b''):
+        stdout = io.StringIO()
+        downloaded = mock.MagicMock()
+        downloaded.__enter__.return_value.read.return_value = response
+        with override_settings(STATICFILES_DIRS=[self.static_dir]), \
+                mock.patch('core.management.commands.vendor_static.urlopen', return_value=downloaded) as urlopen:
+            call_command('vendor_static', stdout=stdout)
+        return urlopen, stdout.getvalue()
+
+    def test_asset_urls_are_pinned(self):
+        for url, _integrity in VENDOR_ASSETS.values():
+            self.assertRegex(url, r'@\d+\.\d+\.\d+/', url)
+
+    def test_collectstatic_fails_on_missing_or_modified_file(self):
+        self.register(subresource_integrity(b'kitaplik'))
+        with self.assertRaisesMessage(ImproperlyConfigured, f'{self.path} (yok)'):
+            self.post_process()
+        self.write(b'')
+        with self.assertRaisesMessage(ImproperlyConfigured, f'{self.path} (özet uyuşmuyor)'):
+            self.post_process()
+        self.write(b'kitaplik')
+        self.assertEqual(self.post_process(), [])
+
+    def test_command_downloads_and_verifies(self):
+        self.register(subresource_integrity(b'kitaplik'))
+        urlopen, _output = self.vendor_static_command(b'kitaplik')
+        self.assertEqual(urlopen.call_args.args[0].full_url, self.url)
+        with open(os.path.join(self.static_dir, self.path), 'rb') as f:
+            self.assertEqual(f.read(), b'kitaplik')
+
+        # Mevcut dosya tekrar indirilmez, özeti doğrulanır
+        urlopen, _output = self.vendor_static_command()
+        urlopen.assert_not_called()
+        self.write(b'degismis')
+        with self.assertRaisesMessage(CommandError, 'özeti kayıtlı değerle uyuşmuyor'):
+            self.vendor_static_command()
+
+    def test_command_rejects_tampered_download(self):
+        self.register(subresource_integrity(b'kitaplik'))
+        with self.assertRaises(CommandError):
+            self.vendor_static_command(b'baska')
+        self.assertFalse(os.path.exists(os.path.join(self.static_dir, self.path)))
+
+    def test_command_reports_unrecorded_digest(self):
+        self.register(None)
+        _urlopen, output = self.vendor_static_command(b'kitaplik')
+        self.assertIn(subresource_integrity(b'kitaplik'), output)
+
+    def test_template_tag_only_accepts_registered_paths(self):
+        self.register(None)
+        self.assertEqual(vendor_static(self.path), f'/static/{self.path}')
+        with self.assertRaises(ValueError):
+            vendor_static('vendor/kayitsiz.js')
+
+
+class OptimisticLockingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('kilit')
+        cls.package = make_package()
+
+    def setUp(self):
+        self.investment = Investment.objects.create(profile=self.profile, package=self.package, amount=Decimal('250'))
+
+    def test_stale_save_is_rejected(self):
+        first = Investment.objects.get(pk=self.investment.pk)
+        second = Investment.objects.get(pk=self.investment.pk)
+        first.amount = Decimal('300')
+        first.save()
+        second.amount = Decimal('400')
+        with self.assertRaises(ConcurrentUpdateError):
+            second.save()
+        self.investment.refresh_from_db()
+        self.assertEqual((self.investment.amount, self.investment.version), (Decimal('300'), 1))
+
+    def test_stale_transition_is_rejected_without_event(self):
+        stale = Investment.objects.get(pk=self.investment.pk)
+        self.investment.transition(Investment.STATUS_APPROVED)
+        with self.assertRaises(ConcurrentUpdateError):
+            stale.transition(Investment.STATUS_CANCELLED)
+        self.investment.refresh_from_db()
+        self.assertEqual(self.investment.status, Investment.STATUS_APPROVED)
+        self.assertEqual(
+            list(InvestmentEvent.objects.filter(investment=self.investment).values_list('to_status', flat=True)),
+            [Investment.STATUS_PENDING, Investment.STATUS_APPROVED],
+        )
+        self.assertEqual(UserInvestmentSummary.objects.get(profile=self.profile).total_invested, Decimal('250'))
+
+    def test_bulk_transition_counts_conflicts(self):
+        Investment.objects.create(profile=self.profile, package=self.package, amount=Decimal('100'))
+        moved, conflicts = Investment.objects.filter(profile=self.profile).transition(Investment.STATUS_APPROVED)
+        self.assertEqual((moved, conflicts), (2, 0))
+        # Zaten hedef durumda olanlar seçilmez
+        self.assertEqual(Investment.objects.filter(profile=self.profile).transition(Investment.STATUS_APPROVED), (0, 0))
+
+    def test_update_fields_save_is_conditional_on_version(self):
+        stale = Investment.objects.get(pk=self.investment.pk)
+        Investment.objects.filter(pk=self.investment.pk).update(version=F('version') + 1)
+        stale.amount = Decimal('999')
+        with self.assertRaises(ConcurrentUpdateError):
+            stale.save(update_fields=['amount'])
+
+        fresh = Investment.objects.get(pk=self.investment.pk)
+        fresh.amount = Decimal('999')
+        fresh.save(update_fields=['amount'])
+        self.assertEqual(fresh.version, 2)
+        self.assertEqual(Investment.objects.values_list('amount', 'version').get(pk=fresh.pk), (Decimal('999'), 2))
+
+    def test_admin_status_change_rebuilds_summary_once(self):
+        admin_user = User.objects.create_superuser('yonetici', 'yonetici@example.com', 'parola-123456')
+        self.client.force_login(admin_user)
+        url = reverse('admin:core_investment_change', args=[self.investment.pk])
+        data = {
+            'profile': self.profile.pk, 'package': self.package.pk, 'amount': '250', 'expected_return': '287.50',
+            'status': Investment.STATUS_APPROVED, 'version': self.investment.version,
+        }
+        rebuild = UserInvestmentSummary.objects.rebuild
+        with mock.patch.object(UserInvestmentSummary.objects, 'rebuild', side_effect=rebuild) as spy:
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(spy.call_count, 1)
+        self.investment.refresh_from_db()
+        self.assertEqual(self.investment.status, Investment.STATUS_APPROVED)
+        self.assertEqual(UserInvestmentSummary.objects.get(profile=self.profile).total_invested, Decimal('250'))
+
+    def test_payment_approval_is_not_stamped_twice(self):
+        confirmation = PaymentConfirmation.objects.create(investment=self.investment, whatsapp_number='5550000000')
+        stale = PaymentConfirmation.objects.get(pk=confirmation.pk)
+        confirmation.set_approved(True)
+        with self.assertRaises(ConcurrentUpdateError):
+            stale.set_approved(True)
+
+
+
+class IdempotencyKeyTests(MediaRootMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('tekrar')
+        cls.package = make_package()
+
+    def setUp(self):
+        self.client.force_login(self.profile.user)
+        self.url = reverse('invest', args=[self.package.pk])
+
+    def post(self, key, amount='500'):
+        return self.client.post(self.url, {'amount': amount, 'agreement': 'on', 'idempotency_key': key})
+
+    def test_form_renders_fresh_key(self):
+        keys = {self.client.get(self.url).context['form']['idempotency_key'].value() for _ in range(2)}
+        self.assertEqual(len(keys), 2)
+
+    def test_resubmission_returns_first_investment(self):
+        first = self.post('anahtar-1')
+        second = self.post('anahtar-1', amount='750')
+        self.assertEqual(Investment.objects.filter(profile=self.profile).count(), 1)
+        investment = Investment.objects.get(profile=self.profile)
+        self.assertEqual(investment.amount, Decimal('500'))
+        target = reverse('submit_payment', args=[investment.pk])
+        self.assertRedirects(first, target, fetch_redirect_response=False)
+        self.assertRedirects(second, target, fetch_redirect_response=False)
+
+    def test_keys_are_scoped_per_profile(self):
+        self.post('ortak-anahtar')
+        other = make_profile('baska')
+        self.client.force_login(other.user)
+        self.post('ortak-anahtar')
+        self.assertEqual(IdempotencyKey.objects.filter(key='ortak-anahtar').count(), 2)
+        self.assertEqual(Investment.objects.filter(package=self.package).count(), 2)
+
+    def test_payment_resubmission_writes_no_file(self):
+        investment = Investment.objects.create(profile=self.profile, package=self.package, amount=Decimal('500'))
+        url = reverse('submit_payment', args=[investment.pk])
+
+        def submit(color):
+            upload = SimpleUploadedFile('dekont.png', image_bytes(color), 'image/png')
+            return self.client.post(url, {'whatsapp_number': '+905301234567', 'payment_screenshot': upload})
+
+        self.assertRedirects(submit('red'), reverse('payment_success'), fetch_redirect_response=False)
+        storage = PaymentConfirmation._meta.get_field('payment_screenshot').storage
+
+        def stored_files():
+            return sorted(os.path.join(path, name) for path, _dirs, files in os.walk(storage.location) for name in files)
+
+        files_before = stored_files()
+        self.assertEqual(len(files_before), 1)
+        self.assertRedirects(submit('blue'), reverse('packages'), fetch_redirect_response=False)
+        self.assertEqual(stored_files(), files_before)
+        self.assertEqual(PaymentConfirmation.objects.filter(investment=investment).count(), 1)
+
+    def test_purge_removes_only_expired_keys(self):
+        self.post('eski')
+        self.post('yeni')
+        IdempotencyKey.objects.filter(profile=self.profile, key='eski').update(
+            created_at=timezone.now() - timedelta(hours=25),
+        )
+        call_command('purge_idempotency_keys', batch_size=1, stdout=io.StringIO())
+        self.assertEqual(list(IdempotencyKey.objects.filter(profile=self.profile).values_list('key', flat=True)), ['yeni'])
+
+
+class ProfilePageTests(MediaRootMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('grafik')
+        package = make_package(name='</script><script>alert(1)</script>')
+        investment = Investment.objects.create(profile=cls.profile, package=package, amount=Decimal('100'))
+        investment.transition(Investment.STATUS_APPROVED)
+
+    def test_package_names_cannot_escape_script_blocks(self):
+        self.client.force_login(self.profile.user)
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, '</script><script>alert(1)')
+        self.assertEqual(response.context['charts']['package']['labels'], ['</script><script>alert(1)</script>'])
+        self.assertEqual(response.context['charts']['package']['data'], [Decimal('100.00')])
+
+    def test_payment_submission_counts_pending_payment(self):
+        investment = Investment.objects.create(profile=self.profile, package=Package.objects.get(), amount=Decimal('50'))
+        self.client.force_login(self.profile.user)
+        upload = SimpleUploadedFile('dekont.png', image_bytes('green'), 'image/png')
+        response = self.client.post(reverse('submit_payment', args=[investment.pk]), {'payment_screenshot': upload})
+        self.assertRedirects(response, reverse('payment_success'), fetch_redirect_response=False)
+        summary = UserInvestmentSummary.objects.get(profile=self.profile)
+        self.assertEqual((summary.pending_payments, summary.total_invested), (1, Decimal('100')))
+
+
+class PaymentFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('akis', 'akis@example.com', 'parola-123456')
+        cls.profile = make_profile('dekontcu')
+        cls.package = make_package()
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def confirmation(self, seconds_ago):
+        investment = Investment.objects.create(profile=self.profile, package=self.package, amount=Decimal('100'))
+        confirmation = PaymentConfirmation.objects.create(investment=investment, whatsapp_number='5550000000')
+        PaymentConfirmation.objects.filter(pk=confirmation.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=seconds_ago),
+        )
+        return confirmation
+
+    def read(self, last_event_id=None):
+        headers = {'Last-Event-ID': last_event_id} if last_event_id else {}
+        response = self.client.get(reverse('payment_feed'), headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events, current = [], {}
+        for line in response.content.decode().splitlines() + ['']:
+            if line:
+                field, _sep, value = line.partition(': ')
+                current[field] = value
+            elif current:
+                events.append(current)
+                current = {}
+        return events
+
+    def test_wsgi_feed_reads_new_confirmations(self):
+        first = self.confirmation(seconds_ago=60)
+        events = self.read()
+        mark = events[-1]['id']
+        self.assertEqual(events[0], {'retry': '2000'})
+        self.assertTrue(mark.endswith(f'|{first.pk}'))
+
+        second = self.confirmation(seconds_ago=30)
+        self.confirmation(seconds_ago=0)  # henüz LAG içinde, sonraki tura kalır
+        events = self.read(mark)
+        self.assertEqual([event.get('event') for event in events], [None, 'confirmation'])
+        data = json.loads(events[1]['data'])
+        self.assertEqual((data['id'], data['username']), (second.pk, 'dekontcu'))
+        self.assertEqual(self.read(events[1]['id']), [{'retry': '2000'}])
+
+    def test_feed_requires_staff(self):
+        self.client.force_login(self.profile.user)
+        self.assertEqual(self.client.get(reverse('payment_feed')).status_code, 403)
+
+
+class WarmUpTests(TestCase):
+    def test_failing_step_does_not_stop_the_rest(self):
+        def broken():
+            raise ImportError("eksik modül")
+
+        steps = (('broken', broken),) + warmup.STEPS
+        with mock.patch.object(warmup, 'STEPS', steps), self.assertLogs('core.warmup', 'ERROR') as logs:
+            timings = warmup.warm_up()
+        self.assertEqual(timings['broken'], 'hata: eksik modül')
+        self.assertEqual(set(timings), {name for name, _step in steps})
+        self.assertIn('broken', logs.output[0])
+
+    def test_can_be_disabled(self):
+        with mock.patch.dict(os.environ, {'DJANGO_WARM_UP': '0'}):
+            self.assertEqual(warmup.warm_up(), {})
+
+
+class EmailUniquenessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.existing = make_profile('mevcut').user
+        cls.other = make_profile('diger').user
+        cls.admin_user = User.objects.create_superuser('eposta', 'eposta@example.com', 'parola-123456')
+
+    def test_register_rejects_case_insensitive_duplicate(self):
+        form = RegisterForm(data={
+            'username': 'yeni', 'email': 'MEVCUT@Example.com', 'password1': 'Zor-parola-987', 'password2': 'Zor-parola-987',
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('email', form.errors)
+
+    def test_admin_change_form_rejects_duplicate_instead_of_500(self):
+        self.client.force_login(self.admin_user)
+        url = reverse('admin:auth_user_change', args=[self.other.pk])
+        data = {
+            'username': 'diger', 'email': 'Mevcut@EXAMPLE.com', 'is_active': 'on',
+            'date_joined_0': '2024-01-01', 'date_joined_1': '00:00:00',
+        }
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('email', response.context['adminform'].form.errors)
+
+        # Kullanıcının kendi adresinin yazımını değiştirmesi serbest
+        response = self.client.post(url, {**data, 'email': 'DIGER@example.com'})
+        self.assertEqual(response.status_code, 302)
+
+
+class SessionTests(TestCase):
+    def load_settings(self, **env):
+        keys = ('SESSION_STRATEGY', 'WEB_CONCURRENCY')
+        environ = {key: value for key, value in os.environ.items() if key not in keys}
+        with mock.patch.dict(os.environ, {**environ, **env}, clear=True):
+            return runpy.run_path(os.path.join(django_settings.BASE_DIR, 'wafelinvest', 'settings.py'))
+
+    def test_strategy_resolution(self):
+        self.assertEqual(self.load_settings()['SESSION_ENGINE'], 'django.contrib.sessions.backends.db')
+        with self.assertRaises(ImproperlyConfigured):
+            self.load_settings(SESSION_STRATEGY='cached_db')
+        self.assertEqual(
+            self.load_settings(SESSION_STRATEGY='cached_db', WEB_CONCURRENCY='1')['SESSION_ENGINE'],
+            'django.contrib.sessions.backends.cached_db',
+        )
+        self.assertEqual(
+            self.load_settings(SESSION_STRATEGY='signed_cookies')['SESSION_ENGINE'],
+            'django.contrib.sessions.backends.signed_cookies',
+        )
+
+    def session_queries(self):
+        user = make_profile('oturum').user
+        self.client.force_login(user)
+        self.client.get(reverse('profile'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+        return [query['sql'] for query in queries if 'django_session' in query['sql']]
+
+    def test_db_sessions_read_the_table_per_request(self):
+        self.assertEqual(len(self.session_queries()), 1)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_cached_db_sessions_skip_the_table(self):
+        self.addCleanup(caches['default'].clear)
+        self.assertEqual(self.session_queries(), [])
+
+    def test_purge_sessions_deletes_expired_in_batches(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'eski{i}', session_data='', expire_date=now - timedelta(days=1)) for i in range(5)]
+            + [Session(session_key=f'yeni{i}', session_data='', expire_date=now + timedelta(days=1)) for i in range(2)]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_sessions', batch_size=2, stdout=io.StringIO())
+        self.assertEqual(sorted(Session.objects.values_list('session_key', flat=True)), ['yeni0', 'yeni1'])
+        self.assertEqual(sum(query['sql'].startswith('DELETE') for query in queries), 3)
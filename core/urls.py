@@ -17,6 +17,8 @@ urlpatterns = [
     # Ödeme işlemleri
     path('payment/submit/<int:investment_id>/', views.submit_payment, name='submit_payment'),
     path('payment-success/', views.payment_success, name='payment_success'),
+    path('payment/<int:confirmation_id>/screenshot/', views.payment_screenshot, name='payment_screenshot'),
+    path('payment/feed/', views.payment_feed, name='payment_feed'),
 
 
     path('privacy-policy/', views.privacy_policy, name='privacy_policy'),
@@ -1,47 +1,28 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.contrib.auth import authenticate, login as auth_login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import IntegrityError, transaction
 from django.db.models import Sum, Count
-from datetime import datetime, timedelta
+from django.db.models.functions import Coalesce, TruncMonth
+from datetime import datetime
 from decimal import Decimal
-from django.core.exceptions import ValidationError
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.utils.timezone import now
 import calendar
-import json
 
 from .models import (
     Package, Investment, PaymentConfirmation, CryptoWallet,
-    SiteSetting, UserInvestmentSummary
+    SiteSetting, UserInvestmentSummary, IdempotencyKey
 )
 from .forms import (
     RegisterForm, InvestmentForm, PaymentConfirmationForm, LoginForm
 )
-
-def calculate_expected_return(package, amount):
-    profit_percent = Decimal(package.profit_percent or 0)
-    return amount * (Decimal(1) + profit_percent / Decimal(100))
-
-def update_user_investment_summary(profile):
-    approved_investments = Investment.objects.filter(profile=profile, status=Investment.STATUS_APPROVED)
-    aggregates = approved_investments.aggregate(
-        total_invested=Sum('amount'),
-        total_return=Sum('expected_return')
-    )
-    total_invested = aggregates['total_invested'] or Decimal('0')
-    total_return = aggregates['total_return'] or Decimal('0')
-
-    pending_payments_count = PaymentConfirmation.objects.filter(
-        investment__profile=profile,
-        admin_approved=False
-    ).count()
-
-    summary, _created = UserInvestmentSummary.objects.get_or_create(profile=profile)
-    summary.total_invested = total_invested
-    summary.total_return = total_return
-    summary.pending_payments = pending_payments_count
-    summary.has_active_investment = approved_investments.exists()
-    summary.save()
+from .media import serve_protected
+from .ratelimit import ratelimit
+from .returns import expected_return, quantize, schedule
 
 def home(request):
     return render(request, 'core/home.html', {'year': datetime.now().year})
@@ -54,38 +35,32 @@ def packages(request):
 def package_detail(request, package_id):
     package = get_object_or_404(Package, pk=package_id)
 
-    # Getiri oranı (Decimal)
-    if 'Basic' in package.name:
-        return_rate = Decimal('0.30')  # %30
-    elif 'Premium' in package.name:
-        return_rate = Decimal('0.50')  # %50
-    elif 'Master' in package.name:
-        return_rate = Decimal('1.00')  # %100
-    else:
-        return_rate = Decimal('0.00')  # Belirtilmemiş
-
-    # Toplam beklenen getiri (yatırım + getiri)
-    expected_return = package.price * (Decimal('1.00') + return_rate)
-
     context = {
         'package': package,
-        'return_rate': return_rate * 100,  # % cinsinden (örn: 30, 50, 100)
-        'expected_return': expected_return,
+        'return_rate': package.profit_percent,  # % cinsinden (örn: 30, 50, 100)
+        # Toplam beklenen getiri (yatırım + getiri)
+        'expected_return': expected_return(package.price, package.profit_percent),
     }
 
     return render(request, 'core/package_detail.html', context)
 
 
+@ratelimit('5/m', key='ip')
 def register(request):
     if request.method == 'POST':
         form = RegisterForm(request.POST)
         if form.is_valid():
-            user = form.save()
-            auth_login(request, user)
-            messages.success(request, 'Kayıt başarılı! Hoş geldiniz.')
-            return redirect('packages')
-        else:
-            messages.error(request, 'Formda hata var, lütfen kontrol edin.')
+            try:
+                with transaction.atomic():
+                    user = form.save()
+            except IntegrityError:
+                # Eşzamanlı kayıtta benzersiz indeks devreye girer
+                form.add_error(None, 'Bu kullanıcı adı veya email zaten kayıtlı.')
+            else:
+                auth_login(request, user, backend='core.backends.ProfileBackend')
+                messages.success(request, 'Kayıt başarılı! Hoş geldiniz.')
+                return redirect('packages')
+        messages.error(request, 'Formda hata var, lütfen kontrol edin.')
     else:
         form = RegisterForm()
     return render(request, 'core/register.html', {'form': form})
@@ -96,6 +71,7 @@ def privacy_policy(request):
 def terms(request):
     return render(request, 'core/terms.html')
 
+@ratelimit('10/m', key='ip')
 def login_view(request):
     if request.method == 'POST':
         form = LoginForm(request, data=request.POST)
@@ -120,6 +96,7 @@ def logout_view(request):
     return redirect('home')
 
 @login_required
+@ratelimit('20/m', key='user_or_ip')
 def invest(request, package_id):
     package = get_object_or_404(Package, id=package_id)
     profile = request.user.profile
@@ -129,13 +106,22 @@ def invest(request, package_id):
             investment = form.save(commit=False)
             investment.profile = profile
             investment.package = package
-            investment.expected_return = calculate_expected_return(package, investment.amount)
+            investment.expected_return = expected_return(investment.amount, package.profit_percent)
             investment.status = Investment.STATUS_PENDING
+            key = form.cleaned_data['idempotency_key']
             try:
                 investment.clean()
-                investment.save()
+                with transaction.atomic():
+                    investment.save()
+                    IdempotencyKey.objects.create(profile=profile, key=key, investment=investment)
                 messages.success(request, 'Yatırımınız başarıyla kaydedildi. Ödeme dekontu yükleyebilirsiniz.')
                 return redirect('submit_payment', investment_id=investment.id)
+            except IntegrityError:
+                # Aynı form daha önce gönderilmiş: ilk gönderimin yatırımına devam edilir
+                existing = IdempotencyKey.objects.filter(profile=profile, key=key).values_list('investment_id', flat=True).first()
+                if existing is None:
+                    raise
+                return redirect('submit_payment', investment_id=existing)
             except ValidationError as e:
                 form.add_error(None, e)
         else:
@@ -145,12 +131,10 @@ def invest(request, package_id):
     return render(request, 'core/invest.html', {'form': form, 'package': package})
 
 @login_required
+@ratelimit('10/m', key='user_or_ip')
 def submit_payment(request, investment_id):
     profile = request.user.profile
     investment = get_object_or_404(Investment, id=investment_id, profile=profile)
-    if PaymentConfirmation.objects.filter(investment=investment).exists():
-        messages.info(request, 'Bu yatırım için zaten ödeme dekontu gönderdiniz.')
-        return redirect('packages')
     if request.method == 'POST':
         post_data = request.POST.copy()
         post_data['investment'] = str(investment.id)
@@ -158,12 +142,29 @@ def submit_payment(request, investment_id):
         if form.is_valid():
             confirmation = form.save(commit=False)
             confirmation.investment = investment
-            confirmation.save()
-            update_user_investment_summary(profile)
+            with transaction.atomic():
+                # Dosya, kayıt eklenmeden önce depoya yazılır: tekrarlanan gönderimde sahipsiz
+                # dosya kalmaması için yatırım satırı kilitlenip önce mevcut dekont aranır
+                Investment.objects.select_for_update().filter(pk=investment.pk).exists()
+                duplicate = PaymentConfirmation.objects.filter(investment=investment).exists()
+                if not duplicate:
+                    try:
+                        with transaction.atomic():
+                            confirmation.save()
+                    except IntegrityError:
+                        # Kilit tutmayan veritabanında (SQLite) eşzamanlı gönderim; dosyayı gc_media toplar
+                        duplicate = True
+            if duplicate:
+                messages.info(request, 'Bu yatırım için zaten ödeme dekontu gönderdiniz.')
+                return redirect('packages')
+            UserInvestmentSummary.objects.rebuild([profile.pk])
             messages.success(request, 'Ödeme dekontu başarıyla gönderildi.')
             return redirect('payment_success')
         else:
             messages.error(request, 'Lütfen geçerli bir dosya yükleyin.')
+    elif PaymentConfirmation.objects.filter(investment=investment).exists():
+        messages.info(request, 'Bu yatırım için zaten ödeme dekontu gönderdiniz.')
+        return redirect('packages')
     else:
         form = PaymentConfirmationForm()
     crypto_wallet = CryptoWallet.objects.filter(active=True).first()
@@ -177,6 +178,35 @@ def submit_payment(request, investment_id):
     }
     return render(request, 'core/submit_payment.html', context)
 
+@login_required
+def payment_screenshot(request, confirmation_id):
+    # Dekontu yalnızca yatırımın sahibi ve yöneticiler görebilir
+    confirmation = get_object_or_404(
+        PaymentConfirmation.objects.select_related('investment__profile'),
+        id=confirmation_id,
+    )
+    if not request.user.is_staff and confirmation.investment.profile.user_id != request.user.id:
+        raise Http404
+    return serve_protected(request, confirmation.payment_screenshot)
+
+async def payment_feed(request):
+    # Admin listesindeki canlı bildirimler (core.feeds); yalnızca dekontları görebilen yöneticiler
+    user = await request.auser()
+    if not (user.is_active and user.is_staff and await user.ahas_perm('core.view_paymentconfirmation')):
+        raise PermissionDenied
+    from . import feeds
+
+    last_event_id = request.headers.get('Last-Event-ID')
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(feeds.stream(last_event_id), content_type='text/event-stream')
+    else:
+        # WSGI'da uzun bağlantı bir worker thread'ini kilitler; yanıt hemen kapanır,
+        # EventSource `retry` sonra Last-Event-ID ile yeniden bağlanır
+        response = HttpResponse(await feeds.snapshot(last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx akışı tamponlamasın
+    return response
+
 @login_required
 def payment_success(request):
     messages.success(request, "Ödemeniz başarıyla gönderildi ve onay bekliyor.")
@@ -189,7 +219,11 @@ def profile(request):
 
     user = request.user
     profile = user.profile
-    summary = UserInvestmentSummary.objects.filter(profile=profile).first()
+    # Kimlik doğrulama backend'i özeti kullanıcıyla birlikte yüklediği için ek sorgu yok
+    try:
+        summary = profile.investment_summary
+    except UserInvestmentSummary.DoesNotExist:
+        summary = None
 
     # Onaylanmış yatırımları al
     approved_investments = Investment.objects.filter(
@@ -197,57 +231,59 @@ def profile(request):
         status=Investment.STATUS_APPROVED
     ).order_by('approved_at')
 
-    # Vade sayaçları (onay tarihine göre)
+    # Vade sayaçları: vade = onay tarihi + paket süresi
+    rows = list(approved_investments.values(
+        'id', 'amount', 'expected_return', 'approved_at', 'package__name', 'package__duration_days'
+    ))
+    schedules = schedule(rows)
     countdowns = []
-    for inv in approved_investments:
-        if inv.approved_at:
-            countdown_end = inv.approved_at + timedelta(days=30)
+    for row in rows:
+        matures_at, accrued = schedules[row['id']]
+        if matures_at:
             countdowns.append({
-                'id': inv.id,
-                'package': inv.package.name,
-                'amount': float(inv.amount),
-                'end_date': countdown_end.strftime("%Y-%m-%dT%H:%M:%S"),  # ISO format for JS
-                'approved_date': inv.approved_at.strftime("%d.%m.%Y"),  # Kullanıcıya gösterilecek format
+                'id': row['id'],
+                'package': row['package__name'],
+                'amount': row['amount'],
+                'accrued': accrued,
+                'matures_at': matures_at,
+                'end_date': matures_at.isoformat(),  # JS için ISO format
+                'approved_date': row['approved_at'].strftime("%d.%m.%Y"),  # Kullanıcıya gösterilecek format
             })
 
-    countdowns_json = json.dumps(countdowns)  # JavaScript için kullanılabilir versiyon
-
-    # Aylık yatırım geçmişi için chart verisi (yatırılan miktar)
-    monthly_investments = {}
-    for inv in approved_investments:
-        key = inv.approved_at.strftime('%Y-%m') if inv.approved_at else inv.created_at.strftime('%Y-%m')
-        monthly_investments[key] = monthly_investments.get(key, 0) + float(inv.amount)
-
-    investment_chart_labels = sorted(monthly_investments.keys())
-    investment_chart_data = [monthly_investments[label] for label in investment_chart_labels]
+    # Aylık yatırım ve getiri grafikleri; tutarlar Decimal kalır, JSON'da metin olarak gider
+    monthly = (
+        approved_investments
+        .annotate(month=TruncMonth(Coalesce('approved_at', 'created_at')))
+        .order_by('month')
+        .values('month')
+        .annotate(invested=Sum('amount'), returns=Sum('expected_return'))
+    )
+    chart_labels = [row['month'].strftime('%Y-%m') for row in monthly]
 
     # Paket bazlı dağılım
-    package_distribution = approved_investments.values('package__name').annotate(total=Sum('amount'))
-
-    # Getiri (kazanç) grafiği için veriler
-    monthly_returns = {}
-    for inv in approved_investments:
-        key = inv.approved_at.strftime('%Y-%m') if inv.approved_at else inv.created_at.strftime('%Y-%m')
-        monthly_returns[key] = monthly_returns.get(key, 0) + float(inv.expected_return or 0)
-
-    returns_chart_labels = sorted(monthly_returns.keys())
-    returns_chart_data = [monthly_returns[label] for label in returns_chart_labels]
+    package_distribution = (
+        approved_investments.order_by('package__name')
+        .values('package__name').annotate(total=Sum('amount'))
+    )
 
+    # Şablonda json_script ile <script type="application/json"> olarak yazılır; paket
+    # adları gibi kullanıcı verileri <script> bloğundan kaçamaz
     return render(request, 'core/profile.html', {
         'user': user,
         'summary': summary,
         'countdowns': countdowns,
-        'countdowns_json': countdowns_json,
-        'investment_chart': {
-            'labels': investment_chart_labels,
-            'data': investment_chart_data,
-        },
-        'returns_chart': {
-            'labels': returns_chart_labels,
-            'data': returns_chart_data,
-        },
-        'package_chart': {
-            'labels': [item['package__name'] for item in package_distribution],
-            'data': [float(item['total']) for item in package_distribution],
+        'charts': {
+            'investment': {
+                'labels': chart_labels,
+                'data': [quantize(row['invested']) for row in monthly],
+            },
+            'returns': {
+                'labels': chart_labels,
+                'data': [quantize(row['returns'] or Decimal('0')) for row in monthly],
+            },
+            'package': {
+                'labels': [item['package__name'] for item in package_distribution],
+                'data': [quantize(item['total']) for item in package_distribution],
+            },
         },
     })
@@ -0,0 +1,92 @@
+"""
+Sürecin ilk isteği karşılamadan önce ısıtılması.
+
+Django'nun URL çözücüsü, şablon motoru (ve templatetag kütüphaneleri), çeviri
+katalogları ve veritabanı arka ucu ilk kullanıldıkları istekte yüklenir; soğuk
+başlangıçtan sonraki ilk ziyaretçi bu maliyeti öder. warm_up() bunları önceden
+yükler. gunicorn preload ile master'da bir kez çalışır, worker'lar fork ile devralır
+(gunicorn.conf.py).
+"""
+import logging
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.urls import get_resolver
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+
+def _urls():
+    # reverse_dict erişimi tüm URL desenlerini (dolayısıyla view modüllerini) yükler;
+    # admin gibi namespace'li include'lar ayrı çözücülerdir
+    resolvers = [get_resolver()]
+    while resolvers:
+        resolver = resolvers.pop()
+        resolver.reverse_dict
+        resolvers.extend(sub for _prefix, sub in resolver.namespace_dict.values())
+
+
+def _templates():
+    # Yalnızca projenin kendi sayfa şablonları; admin şablonları ilk admin isteğinde yüklenir
+    base_dir = Path(settings.BASE_DIR)
+    for engine in engines.all():
+        for directory in map(Path, engine.template_dirs):
+            if not directory.is_relative_to(base_dir) or not directory.is_dir():
+                continue
+            for path in directory.rglob('*.html'):
+                name = path.relative_to(directory).as_posix()
+                if name.startswith('admin/'):
+                    continue
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError:
+                    pass
+
+
+def _translations():
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('')
+
+
+def _database():
+    # Bağlantı fork'tan önce kapatılır; amaç sürücünün ve ilk sorgunun yüklenmesi,
+    # veritabanına ulaşılamıyorsa bunun açılışta görünmesi
+    from django.contrib.auth.models import User
+
+    User.objects.only('pk').first()
+    connections.close_all()
+
+
+STEPS = (
+    ('urls', _urls),
+    ('templates', _templates),
+    ('translations', _translations),
+    ('database', _database),
+)
+
+
+def warm_up():
+    """
+    Adımları sırayla çalıştırır ve {adım: süre (ms) ya da hata} döndürür. Bir adımın
+    hatası açılışı durdurmaz; ilgili bileşen ilk istekte her zamanki gibi yüklenir.
+    """
+    if os.environ.get('DJANGO_WARM_UP', '1') == '0':
+        return {}
+    timings = {}
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            # gunicorn when_ready'de yakalanmayan hata master'ı durdurur
+            logger.exception("Isınma adımı başarısız: %s", name)
+            timings[name] = f'hata: {e}'
+            connections.close_all()
+            continue
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
@@ -1,6 +1,8 @@
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-vgz7(815#_eb#&0xh2b=j^r+yb)pl)^!qcmjga8jp@rvyq(@^x'
@@ -25,22 +27,32 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # whitenoise statik middleware
+    # Dinamik yanıtlar için Brotli/gzip; ETag sıkıştırılmamış içerikten hesaplanır
+    'core.middleware.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.HTMLCacheControlMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'core.urls'
+ROOT_URLCONF = 'wafelinvest.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],  # Proje genel templates klasörü
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Derlenmiş şablonlar process ömrü boyunca bellekte tutulur
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -51,7 +63,7 @@ TEMPLATES = [
     },
 ]
 
-WSGI_APPLICATION = 'core.wsgi.application'
+WSGI_APPLICATION = 'wafelinvest.wsgi.application'
 
 DATABASES = {
     'default': {
@@ -60,6 +72,66 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+# Worker'lar arası paylaşılan cache (oturumlar, rate limit): REDIS_URL=redis://host:6379/0
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+# cached_db oturumları SESSION_CACHE_ALIAS'taki ('default') cache'i kullanır. Süreç içi
+# cache'ler worker'lar arasında paylaşılmaz: çıkış/flush() yalnızca isteği alan worker'daki
+# kopyayı siler, diğerleri eski oturumu tanımaya devam eder
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SHARED_SESSION_CACHE = CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+# Oturum stratejisi: 'db', 'cached_db' (yalnızca paylaşımlı cache ile varsayılan) veya 'signed_cookies'
+SESSION_STRATEGY = os.environ.get('SESSION_STRATEGY', 'cached_db' if SHARED_SESSION_CACHE else 'db')
+if SESSION_STRATEGY == 'cached_db' and not SHARED_SESSION_CACHE and os.environ.get('WEB_CONCURRENCY') != '1':
+    raise ImproperlyConfigured(
+        "SESSION_STRATEGY=cached_db birden çok worker ile paylaşımlı bir oturum cache'i "
+        "(Redis, Memcached veya DatabaseCache) gerektirir; tek worker için WEB_CONCURRENCY=1 verin."
+    )
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_STRATEGY]
+
+# Flash mesajları imzalı cookie'de taşınır; anonim ziyaretçiler için oturum kaydı açılmaz
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Rate limit (core.ratelimit). Sayaçlar RATELIMIT_CACHE'te tutulur; süreç içi bir cache ile
+# her worker kendi sayacını tutar ve limit worker sayısıyla çarpılır. Bu yüzden gunicorn
+# birden çok worker ile paylaşımlı cache (REDIS_URL) olmadan başlamaz (gunicorn.conf.py)
+RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', '1') == '1'
+RATELIMIT_CACHE = 'default'
+# Render proxy arkasında gerçek istemci IP'si X-Forwarded-For içinde gelir
+# (RATELIMIT_IP_META_KEY=HTTP_X_FORWARDED_FOR). Listenin başı istemcinin gönderdiği
+# değerdir ve sahte olabilir; proxy'nin sona eklediği adres kullanılır.
+# RATELIMIT_TRUSTED_PROXIES, istemci ile uygulama arasındaki proxy sayısıdır.
+RATELIMIT_IP_META_KEY = os.environ.get('RATELIMIT_IP_META_KEY', 'REMOTE_ADDR')
+RATELIMIT_TRUSTED_PROXIES = int(os.environ.get('RATELIMIT_TRUSTED_PROXIES', 1))
+
+# Oturum kullanıcısı profil ve yatırım özetiyle tek sorguda yüklenir (core.backends).
+# ModelBackend, önceki sürümde açılmış oturumlar geçerli kalsın diye listede duruyor.
+AUTHENTICATION_BACKENDS = [
+    'core.backends.ProfileBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+# > 0 ise yüklenen kullanıcı bu kadar saniye önbellekte tutulur. Birden çok worker
+# varsa AUTH_USER_CACHE paylaşımlı bir cache (Redis/Memcached) olmalıdır.
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 0))
+AUTH_USER_CACHE = 'default'
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',},
@@ -75,7 +147,36 @@ USE_TZ = True
 # Statik dosyalar için URL ve klasör ayarları
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Django 5.1'den itibaren STATICFILES_STORAGE yerine STORAGES kullanılır
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Ödeme dekontları içerik özetine göre saklanır; aynı dekont tekrar yazılmaz
+    'receipts': {
+        'BACKEND': 'core.storage.ContentAddressedFileSystemStorage',
+    },
+    'staticfiles': {
+        # WhiteNoise hash + gzip/Brotli, üzerine WebP/AVIF görsel varyantları
+        'BACKEND': 'core.storage.OptimizedStaticFilesStorage',
+    },
+}
+
+# Dekontlar S3 uyumlu bir depoda da tutulabilir (django-storages[s3]). MinIO gibi
+# uyumlu servisler için RECEIPTS_S3_ENDPOINT_URL verilir; erişim anahtarları boto3'ün
+# olağan kaynaklarından (AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY) okunur.
+if os.environ.get('RECEIPTS_S3_BUCKET'):
+    STORAGES['receipts'] = {
+        'BACKEND': 'core.s3storage.ContentAddressedS3Storage',
+        'OPTIONS': {
+            'bucket_name': os.environ['RECEIPTS_S3_BUCKET'],
+            'endpoint_url': os.environ.get('RECEIPTS_S3_ENDPOINT_URL') or None,
+            'region_name': os.environ.get('RECEIPTS_S3_REGION') or None,
+            'default_acl': 'private',
+            'querystring_auth': True,
+        },
+    }
 
 # Proje içindeki static klasörünü tanımla (geliştirme için)
 STATICFILES_DIRS = [
@@ -87,4 +188,16 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Yüklemelerin SHA-256 özeti istek okunurken hesaplanır
+FILE_UPLOAD_HANDLERS = [
+    'core.uploadhandlers.HashingMemoryFileUploadHandler',
+    'core.uploadhandlers.HashingTemporaryFileUploadHandler',
+]
+
+# Korumalı medya aktarımı: None (Django akıtır), 'nginx' (X-Accel-Redirect) veya
+# 'sendfile' (Apache/lighttpd X-Sendfile). nginx için MEDIA_ROOT'u gösteren
+# `internal` bir location MEDIA_ACCEL_PREFIX altında tanımlanmalıdır.
+MEDIA_ACCEL_BACKEND = os.environ.get('MEDIA_ACCEL_BACKEND') or None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
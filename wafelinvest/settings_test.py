@@ -0,0 +1,37 @@
+"""
+Test ayarları: python manage.py test --settings=wafelinvest.settings_test [--parallel]
+
+Veritabanı bellekte kurulur ve göçler 0001_squashed_0023 ile başlar. --parallel ile
+her süreç ana test veritabanının bellekteki kendi kopyasını alır; testler
+birbirinin kayıtlarını görmez, sabit ID'lere güvenmemelidir.
+"""
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+
+ALLOWED_HOSTS = ['testserver', 'wafelinvest.onrender.com']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+# Varsayılan PBKDF2 her kullanıcı oluşturma/girişte ~yüzlerce ms harcar
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# staticfiles/ repoda yok (build.sh üretir); testler manifest'e ihtiyaç duymadan
+# static/ altındaki dosyalara düz URL verir
+STORAGES = {**STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}}
+
+# WhiteNoise her test istemcisinde (middleware zinciri yeniden kurulurken) STATIC_ROOT'u
+# baştan taramasın; dosyalar istendiğinde bulunur
+WHITENOISE_AUTOREFRESH = True
+
+# Yüklenen dekontlar repo içindeki media/ yerine geçici dizine yazılır
+MEDIA_ROOT = tempfile.mkdtemp(prefix='wafelinvest-test-media-')
+
+# Testler aynı IP'den art arda istek atar; sınırı test eden test override_settings kullanır
+RATELIMIT_ENABLED = False
+AUTH_USER_CACHE_TIMEOUT = 0
@@ -1,14 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('core.urls')),  # uygulamanın urls'i
 ]
 
-
-# DEBUG modundayken medya dosyalarını sun
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Medya dosyaları (ödeme dekontları) herkese açık sunulmaz; erişim
+# core.views.payment_screenshot üzerinden yetki kontrolüyle yapılır.